@@ -1,54 +1,146 @@
 import sys
 import os
-from PyQt5.QtWidgets import QApplication, QWidget, QLabel
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QPoint, QRect, QUrl
-from PyQt5.QtGui import QPainter, QBrush, QColor, QPalette, QFont, QPixmap
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from PySide6.QtWidgets import QApplication, QWidget, QLabel
+from PySide6.QtCore import Qt, QTimer, QEasingCurve, QEvent, QPoint, QRect, QSize, QUrl, Signal
+from PySide6.QtGui import QPainter, QBrush, QColor, QPalette, QFontMetrics, QPixmap
+import frametrace
+from assets import default_resolver
+from fonts import default_font_resolver
+from timeline import Timeline, TimelinePlayer
+
+# 和 oobe.py 用同一套 Qt 绑定，launcher.py 才能在一个 QApplication 里接着跑首次引导。
+# 多媒体模块依赖系统音频库，缺了只是没有背景音乐
+try:
+    from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+    MULTIMEDIA_AVAILABLE = True
+except ImportError:
+    MULTIMEDIA_AVAILABLE = False
+    print("警告: QtMultimedia 不可用，将不播放背景音乐")
+
+
+class TextSprite(QWidget):
+    """
+    只画一行文字的控件。文字按当前设备像素比栅格化成一张透明 QPixmap 缓存起来，
+    动画每一帧移动位置、改透明度时只贴这张图，不再重新排版和光栅化字形。
+    字体、尺寸或者设备像素比变了才重新栅格化。
+    """
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self._text = text
+        self._color = QColor(color)
+        self._opacity = 1.0
+        self._sprite = None
+
+    def text(self):
+        return self._text
+
+    def opacity(self):
+        return self._opacity
+
+    def set_opacity(self, opacity):
+        opacity = min(1.0, max(0.0, float(opacity)))
+        if opacity != self._opacity:
+            self._opacity = opacity
+            self.update()
+
+    def sizeHint(self):
+        metrics = QFontMetrics(self.font())
+        return QSize(metrics.horizontalAdvance(self._text), metrics.height())
+
+    def invalidate(self):
+        self._sprite = None
+        self.update()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.FontChange:
+            self.invalidate()
+        super().changeEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # 隐藏时 adjustSize 的尺寸要到显示时才补发 resizeEvent，尺寸没变就不用丢掉预先栅格化好的图
+        if self._sprite is not None and self._sprite.deviceIndependentSize().toSize() != self.size():
+            self._sprite = None
+
+    def sprite(self):
+        dpr = self.devicePixelRatioF()
+        if self._sprite is None or self._sprite.devicePixelRatio() != dpr:
+            with frametrace.span("splash.sprite.raster", cat="paint", text=self._text):
+                pixmap = QPixmap(self.size() * dpr)
+                pixmap.setDevicePixelRatio(dpr)
+                pixmap.fill(Qt.transparent)
+                painter = QPainter(pixmap)
+                painter.setRenderHint(QPainter.TextAntialiasing)
+                painter.setFont(self.font())
+                painter.setPen(self._color)
+                painter.drawText(self.rect(), Qt.AlignCenter, self._text)
+                painter.end()
+                self._sprite = pixmap
+        return self._sprite
+
+    def paintEvent(self, event):
+        if self._opacity <= 0:
+            return
+        with frametrace.span("splash.sprite.paint", cat="paint"):
+            painter = QPainter(self)
+            painter.setOpacity(self._opacity)
+            painter.drawPixmap(0, 0, self.sprite())
 
 
 class SplashWindow(QWidget):
-    def __init__(self):
+    """
+    开屏窗口。整段编排（窗口淡入、标题移动 / 淡入 / 闪烁、副标题滑入、淡出、背景音乐）都是 build_timeline()
+    里一条 Timeline 上的轨道，由一个 TimelinePlayer 驱动。autostart=False 时不自动播放，
+    测试里可以直接操作 self.timeline：seek() 到任意时刻，或者 step_through() 不开事件循环一口气播完。
+    """
+    # 淡出动画结束、窗口关闭之前发出，launcher 在这里接上下一个窗口
+    finished = Signal()
+
+    def __init__(self, autostart=True, speed=1.0):
         super().__init__()
 
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        # 背景是纯黑的，用不着半透明窗口：不透明的 backing store 每次重绘前不用先把脏区域清成透明，
+        # 背景也只由 paintEvent 按脏区域填一遍，不再让 Qt 先铺一遍调色板
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
         self.showFullScreen()
-        self.setAutoFillBackground(True)
         palette = self.palette()
         palette.setColor(QPalette.Window, QColor(0, 0, 0))
         self.setPalette(palette)
         self.media_player = None
+        self.audio_output = None
         self.setup_audio()
-        self.animations = []
         self.init_components()
-        QTimer.singleShot(100, self.start_animation_sequence)
+        self.timeline = self.build_timeline()
+        self.timeline.speed = speed
+        self.player = TimelinePlayer(self.timeline)
+        if autostart:
+            QTimer.singleShot(100, self.start_animation_sequence)
     
     def setup_audio(self):
+        if not MULTIMEDIA_AVAILABLE:
+            return
         try:
             self.media_player = QMediaPlayer()
+            self.audio_output = QAudioOutput()
+            self.media_player.setAudioOutput(self.audio_output)
             audio_files = ["bgm.mp3", "bgm.wav", "bgm.ogg", "music.mp3", "sound.mp3"]#音效名称
-            audio_found = False
-            
-            for audio_file in audio_files:
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                audio_path = os.path.join(current_dir, audio_file)
-                
-                if os.path.exists(audio_path):
-                    media_content = QMediaContent(QUrl.fromLocalFile(audio_path))
-                    self.media_player.setMedia(media_content)
-                    self.media_player.setVolume(50)
-                    audio_found = True
-                    print(f"1 {audio_file}")
-                    break
-            
-            if not audio_found:
+            found = default_resolver().first(audio_files)
+            if found:
+                audio_file, audio_path = found
+                self.media_player.setSource(QUrl.fromLocalFile(audio_path))
+                self.audio_output.setVolume(0.5)
+                print(f"1 {audio_file}")
+            else:
                 print("2")
                 
         except Exception as e:
             print(f"22 {e}")
     
     def play_background_music(self):
-        if self.media_player and self.media_player.media().isNull():
+        if self.media_player and self.media_player.source().isEmpty():
             print("222")
             return
         
@@ -61,7 +153,7 @@ class SplashWindow(QWidget):
     
     def stop_background_music(self):
         try:
-            if self.media_player and self.media_player.state() == QMediaPlayer.PlayingState:
+            if self.media_player and self.media_player.playbackState() == QMediaPlayer.PlayingState:
                 self.media_player.stop()
         except Exception as e:
             print(f"22222: {e}")
@@ -71,21 +163,24 @@ class SplashWindow(QWidget):
         self.create_image_label(screen_rect)
         self.create_title_label(screen_rect)
         self.create_subtitle_label(screen_rect)
+        # 文字还隐藏着的时候先栅格化好，字形回退和光栅化都不留到动画的第一帧
+        with frametrace.span("splash.prewarm", cat="paint"):
+            self.title_label.sprite()
+            self.subtitle_label.sprite()
     
     def create_image_label(self, screen_rect):
         self.image_label = QLabel(self)
         self.image_label.setStyleSheet("background: transparent;")
         image_loaded = False
         try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            image_path = os.path.join(current_dir, "114514.png")
+            resolver = default_resolver()
+            image_path = resolver.path("114514.png")
             
             print(f"tp {image_path}")
             
-            if os.path.exists(image_path):
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(320, 320, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            if image_path:
+                scaled_pixmap = resolver.thumbnail("114514.png", (320, 320), self.devicePixelRatioF())
+                if not scaled_pixmap.isNull():
                     self.image_label.setPixmap(scaled_pixmap)
                     self.image_label.setFixedSize(320, 320)
                     image_loaded = True
@@ -124,181 +219,108 @@ class SplashWindow(QWidget):
             self.image_label.move(self.image_pos)
 
     def create_title_label(self, screen_rect):
-        self.title_label = QLabel("壁纸生成器 NEXT", self)
-        self.title_label.setStyleSheet("""
-            QLabel {
-                color: rgb(243, 243, 243);
-                background: transparent;
-                border: none;
-            }
-        """)
-        font = QFont()
-        try:
-            font.setFamily("Bahnschrift SemiCondensed")
-            font.setWeight(QFont.Bold)
-            font.setPointSize(58)
-            self.title_label.setFont(font)
-        except:
-            try:
-                font.setFamily("Microsoft YaHei UI")
-                font.setWeight(QFont.Bold)
-                font.setPointSize(48)
-                self.title_label.setFont(font)
-            except:
-                font.setFamily("Arial")
-                font.setWeight(QFont.Bold)
-                font.setPointSize(48)
-                self.title_label.setFont(font)
+        self.title_label = TextSprite("壁纸生成器 NEXT", QColor(243, 243, 243), self)
+        self.title_label.setFont(default_font_resolver().font("title"))
         self.title_label.adjustSize()
         self.title_start_x = (screen_rect.width() - self.title_label.width()) // 2
         self.title_start_y = (screen_rect.height() - self.title_label.height()) // 2
         self.title_label.move(self.title_start_x, self.title_start_y)
-        self.title_label.setWindowOpacity(0)
+        self.title_label.set_opacity(0)
         self.title_label.hide()
         
         print(f"主标题尺寸: {self.title_label.width()} x {self.title_label.height()}")
     
     def create_subtitle_label(self, screen_rect):
-        self.subtitle_label = QLabel("个性化聚合图片生成平台", self)
-        self.subtitle_label.setStyleSheet("""
-            QLabel {
-                color: rgb(211, 211, 211);
-                background: transparent;
-                border: none;
-            }
-        """)
-        font = QFont()
-        try:
-            font.setFamily("Bahnschrift SemiCondensed")
-            font.setWeight(QFont.Normal)
-            font.setPointSize(34)
-            self.subtitle_label.setFont(font)
-        except:
-            try:
-                font.setFamily("Microsoft YaHei UI")
-                font.setWeight(QFont.Normal)
-                font.setPointSize(24)
-                self.subtitle_label.setFont(font)
-            except:
-                font.setFamily("Arial")
-                font.setWeight(QFont.Normal)
-                font.setPointSize(24)
-                self.subtitle_label.setFont(font)
+        self.subtitle_label = TextSprite("个性化聚合图片生成平台", QColor(211, 211, 211), self)
+        self.subtitle_label.setFont(default_font_resolver().font("subtitle"))
         self.subtitle_label.adjustSize()
         self.subtitle_start_x = (screen_rect.width() - self.subtitle_label.width()) // 2
         self.subtitle_start_y = screen_rect.height() + 100
         self.subtitle_label.move(self.subtitle_start_x, self.subtitle_start_y)
-        self.subtitle_label.setWindowOpacity(0)
+        self.subtitle_label.set_opacity(0)
         self.subtitle_label.hide()
         print(f"副标题尺寸: {self.subtitle_label.width()} x {self.subtitle_label.height()}")
     
+    def build_timeline(self):
+        """
+        整段开屏的编排，时间从 start_animation_sequence 开始算（毫秒）：
+
+            0       窗口淡入 800ms，开始播背景音乐
+            500     标题和副标题显示；标题淡入 600ms、从中间移到 60% 高度 1000ms
+            1300    副标题从屏幕下方滑到标题下面 1000ms，同时淡入
+            1500    标题闪烁：每 150ms 切换一次，切换 6 次后停在不透明
+            4000    停止背景音乐，窗口淡出 800ms
+            4800    finished，关闭窗口
+        """
+        timeline = Timeline("splash")
+        out_cubic = QEasingCurve(QEasingCurve.OutCubic).valueForProgress
+        out_back = QEasingCurve(QEasingCurve.OutBack).valueForProgress
+        title, subtitle = self.title_label, self.subtitle_label
+
+        timeline.tween("window.opacity", self.setWindowOpacity, 0, 800, 0.0, 1.0)
+        timeline.cue("music.play", 0, self.play_background_music)
+
+        timeline.steps("texts.visible", self.set_texts_visible, [(0, False), (500, True)])
+        timeline.tween("title.opacity", title.set_opacity, 500, 600, 0.0, 1.0, out_cubic)
+        title_move = timeline.tween("title.pos", title.move, 500, 1000,
+                                    self.title_start_pos, self.title_target_pos, out_back)
+        timeline.steps("title.opacity", title.set_opacity,
+                       [(1500 + 150 * i, 0.0 if i % 2 else 1.0) for i in range(7)])
+
+        def subtitle_target_pos():
+            # 副标题开始滑入那一刻标题还在回弹，跟着它当时的位置走
+            title_bottom = title_move.value_at(1300).y() + title.height()
+            return QPoint((self.rect().width() - subtitle.width()) // 2, title_bottom + 50)
+
+        timeline.tween("subtitle.opacity", subtitle.set_opacity, 1300, 1000, 0.0, 1.0, out_cubic)
+        timeline.tween("subtitle.pos", subtitle.move, 1300, 1000, self.subtitle_start_pos, subtitle_target_pos)
+
+        timeline.cue("music.stop", 4000, self.stop_background_music)
+        timeline.tween("window.opacity", self.setWindowOpacity, 4000, 800, 1.0, 0.0)
+        timeline.cue("finish", 4800, self.finish_sequence)
+        return timeline
+
+    def title_start_pos(self):
+        return QPoint((self.rect().width() - self.title_label.width()) // 2,
+                      (self.rect().height() - self.title_label.height()) // 2)
+
+    def title_target_pos(self):
+        return QPoint((self.rect().width() - self.title_label.width()) // 2, int(self.rect().height() * 0.6))
+
+    def subtitle_start_pos(self):
+        return QPoint((self.rect().width() - self.subtitle_label.width()) // 2, self.rect().height() + 100)
+
+    def set_texts_visible(self, visible):
+        self.title_label.setVisible(visible)
+        self.subtitle_label.setVisible(visible)
+
     def start_animation_sequence(self):
-        self.window_fade_in()
-        self.play_background_music()
-        QTimer.singleShot(500, self.show_and_animate_texts)
-        QTimer.singleShot(4000, self.window_fade_out)
-    
-    def window_fade_in(self):
-        self.setWindowOpacity(0)
-        self.fade_in_anim = QPropertyAnimation(self, b"windowOpacity")
-        self.fade_in_anim.setDuration(800)
-        self.fade_in_anim.setStartValue(0.0)
-        self.fade_in_anim.setEndValue(1.0)
-        self.fade_in_anim.start()
-    
-    def show_and_animate_texts(self):
-        self.title_label.show()
-        self.subtitle_label.show()
-        self.animate_title()
-        QTimer.singleShot(800, self.animate_subtitle)
-    
-    def animate_title(self):
-        target_y = int(self.rect().height() * 0.6)
-        target_x = (self.rect().width() - self.title_label.width()) // 2
-        self.title_fade_anim = QPropertyAnimation(self.title_label, b"windowOpacity")
-        self.title_fade_anim.setDuration(600)
-        self.title_fade_anim.setStartValue(0.0)
-        self.title_fade_anim.setEndValue(1.0)
-        self.title_fade_anim.setEasingCurve(QEasingCurve.OutCubic)
-        self.title_move_anim = QPropertyAnimation(self.title_label, b"pos")
-        self.title_move_anim.setDuration(1000)
-        self.title_move_anim.setStartValue(QPoint(self.title_start_x, self.title_start_y))
-        self.title_move_anim.setEndValue(QPoint(target_x, target_y))
-        self.title_move_anim.setEasingCurve(QEasingCurve.OutBack)
-        self.title_fade_anim.start()
-        self.title_move_anim.start()
-        QTimer.singleShot(1000, self.start_title_blinking)
-    
-    def start_title_blinking(self):
-        self.title_label.setWindowOpacity(1.0)
-        self.blink_counter = 0
-        self.blink_timer = QTimer()
-        self.blink_timer.timeout.connect(self.do_single_blink)
-        self.blink_timer.start(150)
-    
-    def do_single_blink(self):
-        if self.blink_counter >= 6:
-            self.blink_timer.stop()
-            return
-        current_opacity = self.title_label.windowOpacity()
-        new_opacity = 0.0 if current_opacity > 0.5 else 1.0
-        self.title_label.setWindowOpacity(new_opacity)
-        
-        self.blink_counter += 1
-    
-    def animate_subtitle(self):
-        title_bottom = self.title_label.pos().y() + self.title_label.height()
-        target_y = title_bottom + 50
-        target_x = (self.rect().width() - self.subtitle_label.width()) // 2
-        self.subtitle_fade_anim = QPropertyAnimation(self.subtitle_label, b"windowOpacity")
-        self.subtitle_fade_anim.setDuration(1000)
-        self.subtitle_fade_anim.setStartValue(0.0)
-        self.subtitle_fade_anim.setEndValue(1.0)
-        self.subtitle_fade_anim.setEasingCurve(QEasingCurve.OutCubic)
-        self.subtitle_move_anim = QPropertyAnimation(self.subtitle_label, b"pos")
-        self.subtitle_move_anim.setDuration(1000)
-        self.subtitle_move_anim.setStartValue(QPoint(self.subtitle_start_x, self.subtitle_start_y))
-        self.subtitle_move_anim.setEndValue(QPoint(target_x, target_y))
-        self.subtitle_move_anim.setEasingCurve(QEasingCurve.Linear)
-        self.subtitle_fade_anim.start()
-        self.subtitle_move_anim.start()
-    
-    def window_fade_out(self):
-        self.stop_background_music()
-        
-        self.fade_out_anim = QPropertyAnimation(self, b"windowOpacity")
-        self.fade_out_anim.setDuration(800)
-        self.fade_out_anim.setStartValue(1.0)
-        self.fade_out_anim.setEndValue(0.0)
-        self.fade_out_anim.finished.connect(self.close)
-        self.fade_out_anim.start()
+        self.player.start()
+
+    def finish_sequence(self):
+        self.finished.emit()
+        self.close()
     
     def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.fillRect(self.rect(), QColor(0, 0, 0))
+        with frametrace.span("splash.paint", cat="paint"):
+            painter = QPainter(self)
+            # 只填 Qt 给的脏区域（比如文字移动前后盖住的两块），轴对齐的矩形不需要抗锯齿
+            for rect in event.region():
+                painter.fillRect(rect, Qt.black)
     
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.center_image()
 
-        if hasattr(self, 'title_label') and not self.title_label.isVisible():
-            screen_rect = self.rect()
-            self.title_start_x = (screen_rect.width() - self.title_label.width()) // 2
-            self.title_start_y = (screen_rect.height() - self.title_label.height()) // 2
-            self.title_label.move(self.title_start_x, self.title_start_y)
+        # 文字的起止位置依赖窗口尺寸，尺寸变了重新求值
+        if hasattr(self, 'timeline'):
+            self.timeline.reset_values()
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    app.setAttribute(Qt.AA_EnableHighDpiScaling)
-
-    try:
-        global_font = QFont("Bahnschrift SemiCondensed")
-        global_font.setWeight(QFont.Bold)
-        app.setFont(global_font)
-    except:
-        print("使用系统默认字体")
+    app = QApplication(frametrace.init_from_argv(sys.argv))
+
+    app.setFont(default_font_resolver().font("title", app.font().pointSize()))
     print("=" * 50)
     print(f"当前工作目录: {os.getcwd()}")
     print(f"目录文件列表: {os.listdir('.')}")
@@ -307,4 +329,4 @@ if __name__ == '__main__':
     window = SplashWindow()
     window.show()
     
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec())
\ No newline at end of file
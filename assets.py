@@ -0,0 +1,196 @@
+"""
+资源查找和解码缓存。开屏（DH.py）和首次引导（oobe.py）都从这里拿图片、视频、背景音乐的路径：
+
+    resolver = default_resolver()
+    resolver.path("114514.mp4")                       # 找不到返回 None
+    resolver.first(["bgm.mp3", "bgm.wav"])            # 按顺序第一个存在的 (文件名, 路径)
+    resolver.pixmap("114514.png", (64, 64))           # 解码 + 按比例缩放，结果缓存
+    resolver.thumbnail("114514.png", (64, 64), 2.0)   # 磁盘上预缩放好的变体，不解码也不缩放
+
+第一次用到时把资源目录各扫一遍（每个目录一次 scandir），建好 文件名 -> 路径 的索引，之后查找不再碰文件系统。
+资源目录按顺序是：环境变量 OOBE_ASSET_DIR（可以用 os.pathsep 隔开多个）、程序所在目录、当前工作目录，
+同名文件以排在前面的目录为准；文件名不区分大小写。
+
+解码出来的 QImage / QPixmap 放在一个按字节数限制大小的 LRU 里，同一个进程里（比如 launcher）开屏和引导共用，
+原图只解码一次，不同尺寸的缩放结果分别缓存。QImage 可以在任意线程取，QPixmap 只能在 GUI 线程取。
+PRESCALED 里的图片另外有一份按 (逻辑尺寸, 设备像素比) 预缩放的磁盘缓存（thumbnail_cache），
+环境变量 OOBE_THUMBNAIL_CACHE=0 时不用。
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import frametrace
+from thumbnail_cache import ThumbnailCache, render_variant
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# 需要预缩放的图片和用到它的逻辑尺寸：开屏的大图 320x320，引导页的图标 64x64
+PRESCALED = {"114514.png": ((320, 320), (64, 64))}
+
+
+def _byte_size(value):
+    # QPixmap 没有 sizeInBytes，按 32 位像素估算
+    if hasattr(value, "sizeInBytes"):
+        return value.sizeInBytes()
+    return value.width() * value.height() * 4
+
+
+def _scaled(image, size):
+    from PySide6.QtCore import Qt
+    if image.isNull():
+        return image
+    return image.scaled(size[0], size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def default_asset_dirs():
+    dirs = [d for d in os.environ.get("OOBE_ASSET_DIR", "").split(os.pathsep) if d]
+    dirs.append(os.path.dirname(os.path.abspath(__file__)))
+    dirs.append(os.getcwd())
+    return dirs
+
+
+class AssetResolver:
+    """
+    资源目录的 文件名 -> 路径 索引加上解码结果的 LRU 缓存。
+    load_times 记录每个键第一次加载（解码 / 缩放）的耗时，hits / misses 是缓存命中次数，benchmarks/asset_cache.py 用来报告。
+    """
+
+    def __init__(self, dirs=None, max_bytes=DEFAULT_MAX_BYTES, thumbnails=None):
+        self.dirs = list(dirs) if dirs is not None else default_asset_dirs()
+        self.max_bytes = max_bytes
+        self.thumbnails = thumbnails
+        self.load_times = {}
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        self._cache = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        index = {}
+        for directory in self.dirs:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        index.setdefault(entry.name.lower(), entry.path)
+                except OSError:
+                    pass
+        return index
+
+    @property
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                with frametrace.span("asset.scan", cat="io"):
+                    self._index = self._scan()
+            return self._index
+
+    def rescan(self):
+        """资源目录里的文件变了（比如测试里新生成的视频）时重新扫描，已解码的缓存也一起丢掉。"""
+        with self._lock:
+            self._index = None
+            self._cache.clear()
+            self._bytes = 0
+
+    def path(self, name):
+        return self.index.get(name.lower())
+
+    def first(self, names):
+        """按顺序返回第一个存在的 (文件名, 路径)，都不存在时返回 None。"""
+        for name in names:
+            path = self.path(name)
+            if path:
+                return name, path
+        return None
+
+    def _decode(self, name):
+        from PySide6.QtGui import QImage
+        path = self.path(name)
+        return QImage(path) if path else QImage()
+
+    def image(self, name, size=None):
+        """解码成 QImage；size=(宽, 高) 时按 KeepAspectRatio 平滑缩放。找不到或者解码失败返回空的 QImage。"""
+        if size is None:
+            return self._cached(("image", name.lower(), None), lambda: self._decode(name))
+        return self._cached(("image", name.lower(), size), lambda: _scaled(self.image(name), size))
+
+    def pixmap(self, name, size=None):
+        """
+        和 image() 一样，返回 QPixmap，只能在 GUI 线程调用。
+        原图单独转成 QPixmap 缓存（预乘 alpha 的格式缩放起来比 QImage 的 ARGB32 快一倍多），缩放都从它出发。
+        """
+        from PySide6.QtGui import QPixmap
+        if size is None:
+            return self._cached(("pixmap", name.lower(), None), lambda: QPixmap.fromImage(self._decode(name)))
+        return self._cached(("pixmap", name.lower(), size), lambda: _scaled(self.pixmap(name), size))
+
+    def thumbnail(self, name, size, dpr=1.0):
+        """
+        size 逻辑尺寸、dpr 设备像素比下的 QPixmap（已经设好设备像素比），只能在 GUI 线程调用。
+        优先读磁盘上预缩放好的变体；没有时当场缩放一次，同时在后台把 PRESCALED 里这个设备像素比的变体都生成好。
+        """
+        from PySide6.QtGui import QPixmap
+
+        def load():
+            path = self.path(name)
+            if not path:
+                return QPixmap()
+            image = self.thumbnails.load(path, size, dpr) if self.thumbnails is not None else None
+            if image is None:
+                original = self.image(name)
+                image = render_variant(original, size, dpr)
+                if self.thumbnails is not None and not original.isNull():
+                    sizes = set(PRESCALED.get(name.lower(), ())) | {size}
+                    self.thumbnails.prefill(path, [(item, dpr) for item in sorted(sizes)], original)
+            return QPixmap.fromImage(image)
+
+        return self._cached(("thumbnail", name.lower(), size, dpr), load)
+
+    def _cached(self, key, load):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        start = time.perf_counter()
+        with frametrace.span("asset.load", cat="io", key=str(key)):
+            value = load()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        size = _byte_size(value)
+        with self._lock:
+            self.load_times.setdefault(key, elapsed)
+            if value.isNull() or size > self.max_bytes:
+                return value
+            if key not in self._cache:
+                self._cache[key] = value
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._bytes -= _byte_size(evicted)
+        return value
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_resolver():
+    """进程里共用的一个 AssetResolver，第一次调用时创建。"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            thumbnails = None
+            if os.environ.get("OOBE_THUMBNAIL_CACHE", "1") != "0":
+                thumbnails = ThumbnailCache()
+            _default = AssetResolver(thumbnails=thumbnails)
+        return _default
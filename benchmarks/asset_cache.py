@@ -0,0 +1,143 @@
+"""
+资源加载基准：用新的 AssetResolver 模拟 launcher 里开屏和首次引导各自取资源的过程，记录第一次（冷）和之后（缓存）的耗时：
+
+    scan           第一次查找时扫描资源目录、建索引
+    lookup         之后每次按文件名查路径
+    pixmap_320     开屏的 320x320 图：解码原图 + 缩放 + 转 QPixmap
+    pixmap_64      引导页的 64x64 图标：原图已经在缓存里，只缩放
+    audio          按候选列表找背景音乐
+    thumbnail      开屏 + 引导按 --dpr 取预缩放图：冷 = 磁盘缓存为空（当场缩放），热 = 读磁盘上的变体
+
+时间单位都是毫秒。默认用仓库里的 114514.png，不存在时在临时目录生成一张 1024x1024 的图。
+
+    python benchmarks/asset_cache.py
+    python benchmarks/asset_cache.py -n 20 --image other.png
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from assets import AssetResolver, default_asset_dirs  # noqa: E402
+from thumbnail_cache import ThumbnailCache  # noqa: E402
+
+AUDIO_CANDIDATES = ["bgm.mp3", "bgm.wav", "bgm.ogg", "music.mp3", "sound.mp3"]
+
+
+def make_image(path, size=1024):
+    from PySide6.QtGui import QColor, QImage, QLinearGradient, QPainter
+
+    image = QImage(size, size, QImage.Format_ARGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, size, size)
+    gradient.setColorAt(0, QColor(255, 120, 0))
+    gradient.setColorAt(1, QColor(0, 80, 255))
+    painter.fillRect(image.rect(), gradient)
+    painter.end()
+    image.save(path)
+
+
+def measure(dirs, name):
+    resolver = AssetResolver(dirs)
+    timings = {}
+
+    def timed(label, func):
+        start = time.perf_counter()
+        result = func()
+        timings[label] = (time.perf_counter() - start) * 1000
+        return result
+
+    timed("scan", lambda: resolver.path(name))
+    timed("lookup", lambda: resolver.path(name))
+    first = timed("pixmap_320", lambda: resolver.pixmap(name, (320, 320)))
+    if first.isNull():
+        raise RuntimeError(f"无法解码 {name}")
+    timed("pixmap_64", lambda: resolver.pixmap(name, (64, 64)))
+    timed("audio", lambda: resolver.first(AUDIO_CANDIDATES))
+    timed("pixmap_320_cached", lambda: resolver.pixmap(name, (320, 320)))
+    timed("pixmap_64_cached", lambda: resolver.pixmap(name, (64, 64)))
+    return timings
+
+
+def measure_uncached(path):
+    """以前的做法：开屏和引导各自 os.path.exists + QPixmap(路径) 解码一遍再缩放，背景音乐逐个 exists。"""
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QPixmap, QPixmapCache
+
+    # QPixmap(路径) 自己会放进 QPixmapCache，第二次同一个路径不再解码；清掉它模拟刚启动
+    QPixmapCache.clear()
+    start = time.perf_counter()
+    for audio_file in AUDIO_CANDIDATES:
+        os.path.exists(os.path.join(os.path.dirname(os.path.abspath(__file__)), audio_file))
+    if os.path.exists(path):
+        QPixmap(path).scaled(320, 320, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    if os.path.exists(path):
+        QPixmap(path).scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_thumbnails(dirs, name, cache_dir, dpr):
+    """返回 (冷, 热) 两次开屏 + 引导取预缩放图的耗时；冷的那次等后台生成完变体再测热的。"""
+    import shutil
+    import threading
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    timings = []
+    for _ in range(2):
+        resolver = AssetResolver(dirs, thumbnails=ThumbnailCache(cache_dir))
+        start = time.perf_counter()
+        resolver.thumbnail(name, (320, 320), dpr)
+        resolver.thumbnail(name, (64, 64), dpr)
+        timings.append((time.perf_counter() - start) * 1000)
+        for thread in threading.enumerate():
+            if thread.name == "thumbnail-prefill":
+                thread.join()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资源查找和解码缓存的冷 / 热耗时")
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("--image", help="要加载的图片（默认仓库里的 114514.png）")
+    parser.add_argument("--dpr", type=float, default=2.0, help="预缩放图的设备像素比")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])  # noqa: F841
+
+    with tempfile.TemporaryDirectory() as workdir:
+        dirs = default_asset_dirs()
+        name = "114514.png"
+        if args.image:
+            dirs.insert(0, os.path.dirname(os.path.abspath(args.image)))
+            name = os.path.basename(args.image)
+        elif not AssetResolver(dirs).path(name):
+            make_image(os.path.join(workdir, name))
+            dirs.insert(0, workdir)
+        print(f"图片: {AssetResolver(dirs).path(name)}，资源目录: {', '.join(dirs)}")
+
+        samples = [measure(dirs, name) for _ in range(args.runs)]
+        uncached = statistics.median(measure_uncached(AssetResolver(dirs).path(name)) for _ in range(args.runs))
+        cache_dir = os.path.join(workdir, "thumbnails")
+        thumbnails = [measure_thumbnails(dirs, name, cache_dir, args.dpr) for _ in range(args.runs)]
+
+    median = {label: statistics.median(s[label] for s in samples) for label in samples[0]}
+    print(f"扫描目录 {median['scan']:.3f}ms，之后查找 {median['lookup'] * 1000:.1f}us")
+    print(f"开屏 320x320: 第一次 {median['pixmap_320']:.2f}ms，缓存 {median['pixmap_320_cached'] * 1000:.1f}us")
+    print(f"引导 64x64:   第一次 {median['pixmap_64']:.2f}ms（原图已缓存），缓存 {median['pixmap_64_cached'] * 1000:.1f}us")
+    print(f"背景音乐候选查找 {median['audio'] * 1000:.1f}us")
+    total = sum(median[label] for label in ("scan", "pixmap_320", "pixmap_64", "audio"))
+    print(f"开屏 + 引导合计 {total:.2f}ms，以前的做法 {uncached:.2f}ms")
+    cold = statistics.median(t[0] for t in thumbnails)
+    warm = statistics.median(t[1] for t in thumbnails)
+    print(f"预缩放图 @{args.dpr:g}x: 磁盘缓存为空 {cold:.2f}ms，读磁盘上的变体 {warm:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+视频解码后端基准：对 video_backends 里每个探测通过的后端，分别冷启动一个子进程解码同一段视频，记录：
+
+    load           导入后端依赖的模块（cv2 / av / QtMultimedia）
+    first_frame    open() 到第一帧转换好（含打开文件、探测流、解码第一帧和缩放）
+    decode_fps     整段视频解码 + 缩放到目标尺寸的吞吐（帧 / 秒）
+    scratch        拉帧的后端平均每帧在给定缓冲之外临时分配的帧数（PyAV 是 1，OpenCV 是 0）
+
+时间单位都是毫秒。QtMultimedia 自己按播放时间送帧，用 setPlaybackRate 加速播放来估吞吐，数字只是下限。
+默认解码仓库里的 114514.mp4，不存在时用 startup.make_clip 生成一段合成视频。
+
+    python benchmarks/decoders.py                         # 所有可用后端各跑 3 次
+    python benchmarks/decoders.py -b opencv -b pyav --clip other.mp4 --size 1920x1080
+    python benchmarks/decoders.py --output decoders.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from video_backends import BACKENDS, BACKEND_ORDER, available_backends, fit_size  # noqa: E402
+
+RESULT_PREFIX = "BENCH_RESULT "
+METRICS = ("load", "first_frame", "decode_fps")
+QT_PLAYBACK_RATE = 8.0
+
+
+def _ms(start, end):
+    return (end - start) * 1000
+
+
+# ---------------------------------------------------------------- 子进程
+
+def _measure_pull(backend, clip, target):
+    import numpy as np
+
+    start = time.perf_counter()
+    backend.load()
+    loaded = time.perf_counter()
+    decoder = backend(clip)
+    try:
+        if not decoder.open():
+            raise RuntimeError(f"{backend.name} 无法打开 {clip}")
+        dst_w, dst_h, _ = fit_size(decoder.width, decoder.height, target)
+        out = np.empty((dst_h, dst_w, 3), dtype=np.uint8)
+        frames = 0
+        first = None
+        while decoder.grab():
+            decoder.pts(frames)
+            if not decoder.retrieve(out):
+                break
+            frames += 1
+            if first is None:
+                first = time.perf_counter()
+        end = time.perf_counter()
+    finally:
+        decoder.close()
+    if not frames:
+        raise RuntimeError(f"{backend.name} 没有解码出任何帧")
+    return {"load": _ms(start, loaded), "first_frame": _ms(loaded, first),
+            "decode_fps": frames / (end - loaded), "frames": frames, "clip_fps": decoder.fps,
+            "scratch": decoder.scratch_allocations / frames}
+
+
+def _measure_pushed(backend, clip, target, timeout):
+    from PySide6.QtCore import QTimer, Qt
+    from PySide6.QtGui import QGuiApplication
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])
+    start = time.perf_counter()
+    backend.load()
+    loaded = time.perf_counter()
+    decoder = backend(clip)
+    decoder.playback_rate = QT_PLAYBACK_RATE
+    stats = {"frames": 0, "first": None, "end": None, "error": None}
+
+    def on_frame(image, pts):
+        dst_w, dst_h, _ = fit_size(image.width(), image.height(), target)
+        image.scaled(dst_w, dst_h, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        stats["frames"] += 1
+        if stats["first"] is None:
+            stats["first"] = time.perf_counter()
+
+    def on_finished(error):
+        stats["end"] = time.perf_counter()
+        stats["error"] = error
+        app.quit()
+
+    decoder.start(on_frame, on_finished)
+    QTimer.singleShot(int(timeout * 1000), app.quit)
+    app.exec()
+    decoder.close()
+    if stats["error"] or not stats["frames"] or stats["end"] is None:
+        raise RuntimeError(stats["error"] or f"{backend.name} 没有播完")
+    return {"load": _ms(start, loaded), "first_frame": _ms(loaded, stats["first"]),
+            "decode_fps": stats["frames"] / (stats["end"] - loaded), "frames": stats["frames"], "clip_fps": None}
+
+
+def child_main(args):
+    backend = BACKENDS[args.child]
+    target = (args.width, args.height, 1.0)
+    if backend.pull:
+        result = _measure_pull(backend, args.clip, target)
+    else:
+        result = _measure_pushed(backend, args.clip, target, args.timeout)
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ---------------------------------------------------------------- 主进程
+
+def run_backend(name, args, env):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name, "--clip", args.clip,
+         "--size", f"{args.width}x{args.height}", "--timeout", str(args.timeout)],
+        env=env, capture_output=True, text=True, timeout=args.timeout + 30)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"{name} 没有输出结果（退出码 {proc.returncode}）:\n{proc.stderr[-2000:]}")
+
+
+def summarize(samples):
+    return {name: round(statistics.median(s[name] for s in samples), 2) for name in METRICS}
+
+
+def recommend(results, clip_fps):
+    """能跟上片子帧率的后端里，首帧最快的那个。"""
+    candidates = [(entry["median"]["first_frame"], name) for name, entry in results.items()
+                  if "median" in entry and entry["median"]["decode_fps"] >= clip_fps]
+    return min(candidates)[1] if candidates else None
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频解码后端的首帧时间和解码吞吐")
+    parser.add_argument("-b", "--backend", action="append", choices=BACKEND_ORDER,
+                        help="只测这些后端，可以给多次（默认所有探测通过的后端）")
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--clip", help="要解码的视频（默认仓库里的 114514.mp4）")
+    parser.add_argument("--size", default="960x540", help="缩放到的目标尺寸，保持宽高比")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次运行的超时秒数")
+    parser.add_argument("--output", help="结果写到这个 JSON 文件")
+    parser.add_argument("--child", choices=BACKEND_ORDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.width, args.height = parse_size(args.size)
+
+    if args.child:
+        child_main(args)
+        return
+
+    names = args.backend or [backend.name for backend in available_backends()]
+    if not names:
+        print("没有可用的视频解码后端")
+        sys.exit(1)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1")
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.clip:
+            args.clip = os.path.join(REPO_DIR, "114514.mp4")
+            if not os.path.exists(args.clip):
+                from startup import make_clip
+                args.clip = os.path.join(workdir, "clip.mp4")
+                make_clip(args.clip)
+        print(f"视频: {args.clip}，缩放到 {args.width}x{args.height}")
+
+        results = {"python": sys.version.split()[0], "platform": sys.platform, "clip": args.clip,
+                   "size": [args.width, args.height], "runs": args.runs, "backends": {}}
+        clip_fps = 0.0
+        for name in names:
+            try:
+                samples = [run_backend(name, args, env) for _ in range(args.runs)]
+            except Exception as e:
+                print(f"[{name}] 运行失败 - {e}")
+                results["backends"][name] = {"error": str(e)}
+                continue
+            median = summarize(samples)
+            clip_fps = max([clip_fps] + [s["clip_fps"] or 0.0 for s in samples])
+            results["backends"][name] = {"median": median, "samples": samples}
+            scratch = "" if "scratch" not in samples[0] else f", scratch={samples[0]['scratch']:.2f}/帧"
+            print(f"[{name}] load={median['load']:.1f}ms, first_frame={median['first_frame']:.1f}ms, "
+                  f"decode_fps={median['decode_fps']:.1f}{scratch}")
+
+    best = recommend(results["backends"], clip_fps)
+    results["recommended"] = best
+    if best:
+        print(f"推荐: {best}（能跟上 {clip_fps:.0f} fps 的后端里首帧最快），设置 OOBE_DECODE_BACKEND={best}")
+    else:
+        print(f"没有后端能跟上 {clip_fps:.0f} fps")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
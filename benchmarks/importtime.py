@@ -0,0 +1,114 @@
+"""
+导入耗时报告：在子进程里用 python -X importtime 导入入口模块，重复多次取中位数，
+输出各模块的累计耗时排行，可以存成 JSON 跟以后的版本对比。
+
+    python benchmarks/importtime.py                  # 默认测 oobe
+    python benchmarks/importtime.py -m DH -n 7
+    python benchmarks/importtime.py --json importtime.json
+    python benchmarks/importtime.py --compare importtime.json
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_once(module, python):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # 不写 .pyc，多次测量的条件保持一致
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    proc = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = {
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": len(indent) // 2,
+        }
+    return modules
+
+
+def measure(module, runs, python):
+    samples = [measure_once(module, python) for _ in range(runs)]
+    names = set().union(*samples)
+    report = {}
+    for name in names:
+        rows = [s[name] for s in samples if name in s]
+        report[name] = {
+            "self_us": int(statistics.median(r["self_us"] for r in rows)),
+            "cumulative_us": int(statistics.median(r["cumulative_us"] for r in rows)),
+            "depth": rows[0]["depth"],
+        }
+    return {
+        "module": module,
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "total_us": report.get(module, {}).get("cumulative_us", 0),
+        "modules": report,
+    }
+
+
+def print_report(result, top):
+    print(f"模块 {result['module']} 导入总耗时: {result['total_us'] / 1000:.1f} ms "
+          f"（{result['runs']} 次中位数, Python {result['python']}）")
+    rows = sorted(result["modules"].items(), key=lambda item: item[1]["cumulative_us"], reverse=True)
+    print(f"{'累计(ms)':>10} {'自身(ms)':>10}  模块")
+    for name, row in rows[:top]:
+        print(f"{row['cumulative_us'] / 1000:>10.1f} {row['self_us'] / 1000:>10.1f}  {'  ' * row['depth']}{name}")
+
+
+def compare(result, baseline, threshold):
+    """打印和基线的差异，总耗时超过阈值比例时返回 False。"""
+    old_total = baseline["total_us"]
+    new_total = result["total_us"]
+    ratio = new_total / old_total if old_total else 1.0
+    print(f"总耗时: {old_total / 1000:.1f} ms -> {new_total / 1000:.1f} ms ({(ratio - 1) * 100:+.1f}%)")
+    added = sorted(set(result["modules"]) - set(baseline["modules"]))
+    removed = sorted(set(baseline["modules"]) - set(result["modules"]))
+    if added:
+        print("新增导入:", ", ".join(added))
+    if removed:
+        print("不再导入:", ", ".join(removed))
+    return ratio <= 1 + threshold
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入口模块的导入耗时报告")
+    parser.add_argument("-m", "--module", default="oobe")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", help="把结果写到这个 JSON 文件")
+    parser.add_argument("--compare", help="和之前保存的 JSON 结果对比")
+    parser.add_argument("--threshold", type=float, default=0.10, help="总耗时允许变慢的比例")
+    parser.add_argument("--python", default=sys.executable)
+    args = parser.parse_args()
+
+    result = measure(args.module, args.runs, args.python)
+    print_report(result, args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(result, baseline, args.threshold):
+            print("导入耗时超过基线阈值")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
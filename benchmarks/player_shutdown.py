@@ -0,0 +1,229 @@
+"""
+VideoPlayer 停止的压力测试：对每个解码后端反复 打开 -> 播放 -> 随机等一会 -> stop()，记录：
+
+    stop_call      stop() 本身在主线程上占用的时间（不应该等线程）
+    gone           stop() 到 stopped 信号（线程都退出、解码器和共享内存都释放）的时间
+    natural        不停止、自然播完时 video_finished -> stop() -> stopped 的时间
+
+时间单位都是毫秒。每轮结束后检查没有残留的解码 / 呈现线程、解码子进程，
+被停掉的播放不应该再发 video_finished_signal。
+
+另外通过真正的入口（oobe.main() 和 launcher.main()）启动子进程，在开场视频播放中关掉首次引导窗口，
+检查进程退出码是 0、没有异常输出：解码线程没收完尾就退出解释器时进程会异常终止。
+任何一项超过上限或者进程没有正常退出时退出码为 1。
+
+    python benchmarks/player_shutdown.py                    # 线程内解码和解码子进程各 20 轮
+    python benchmarks/player_shutdown.py -n 50 -b process --max-gone 500
+    python benchmarks/player_shutdown.py --output shutdown.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import tempfile
+import shutil
+import threading
+import statistics
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from startup import make_clip  # noqa: E402
+
+DEFAULT_BACKENDS = ("opencv", "process")
+ENTRY_POINTS = ("oobe", "launcher")
+# 子进程输出里出现这些说明不是干净退出
+CRASH_MARKERS = ("Traceback", "Fatal Python error", "terminate called")
+
+
+def _ms(start, end):
+    return (end - start) * 1000
+
+
+class _Window:
+    """VideoPlayer 只回调 parent_window.video_finished()。"""
+
+    def __init__(self):
+        self.finished = 0
+
+    def video_finished(self):
+        self.finished += 1
+
+
+def _wait_for(app, predicate, timeout):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def run_cycle(app, clip, backend, delay, timeout):
+    """一轮 打开 -> 播放 -> 等 delay 秒 -> stop()；delay 为 None 时等自然播完。返回这一轮的计时和问题。"""
+    from oobe import VideoPlayer
+
+    window = _Window()
+    player = VideoPlayer(clip, window, decode_backend=backend)
+    player.set_target_size(320, 180)
+    state = {"finished": 0, "stopped": None}
+    player.video_finished_signal.connect(lambda: state.__setitem__("finished", state["finished"] + 1))
+    player.stopped.connect(lambda: state.__setitem__("stopped", time.perf_counter()))
+    player.frame_available.connect(player.take_frame)
+
+    player.play()
+    problems = []
+    result = {}
+    if delay is None:
+        if not _wait_for(app, lambda: state["finished"], timeout):
+            problems.append("没有播完")
+        start = time.perf_counter()
+    else:
+        _wait_for(app, lambda: False, delay)
+        start = time.perf_counter()
+    player.stop()
+    result["stop_call"] = _ms(start, time.perf_counter())
+    if not _wait_for(app, lambda: state["stopped"] is not None, timeout):
+        problems.append("没有收到 stopped")
+    else:
+        result["natural" if delay is None else "gone"] = _ms(start, state["stopped"])
+    app.processEvents()
+    if delay is not None and state["finished"]:
+        problems.append("停止以后又发了 video_finished_signal")
+    if any(t.is_alive() for t in (player.thread, player.present_thread) if t is not None):
+        problems.append("线程没有退出")
+    if player._process_decoder is not None:
+        problems.append("解码子进程没有释放")
+    return result, problems
+
+
+def exit_child(entry, close_ms):
+    """子进程：用真正的入口启动，首次引导窗口建好 close_ms 毫秒后关掉它。"""
+    from PySide6.QtCore import QTimer
+    import oobe
+
+    init = oobe.OOBEWindow.__init__
+
+    def patched_init(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        QTimer.singleShot(close_ms, self.close)
+
+    oobe.OOBEWindow.__init__ = patched_init
+    if entry == "launcher":
+        import launcher
+        sys.argv = sys.argv[:1]
+        launcher.main()
+    else:
+        sys.argv = sys.argv[:1]
+        oobe.main()
+
+
+def run_exit(entry, backend, close_ms, workdir, timeout):
+    """跑一次 exit_child，返回问题列表（空表示正常退出）。"""
+    config_dir = os.path.join(workdir, "config")
+    shutil.rmtree(config_dir, ignore_errors=True)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", OOBE_DECODE_BACKEND=backend, OOBE_FRAME_CACHE="0",
+               OOBE_ASSET_DIR=workdir, XDG_CONFIG_HOME=config_dir, APPDATA=config_dir,
+               XDG_CACHE_HOME=os.path.join(workdir, "cache"), LOCALAPPDATA=os.path.join(workdir, "cache"))
+    cmd = [sys.executable, os.path.abspath(__file__), "--exit-child", entry, "--close-ms", str(close_ms)]
+    try:
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return [f"{entry}: 关窗口以后进程没有退出"]
+    problems = []
+    if proc.returncode != 0:
+        problems.append(f"{entry}: 退出码 {proc.returncode}")
+    output = proc.stdout + proc.stderr
+    for marker in CRASH_MARKERS:
+        if marker in output:
+            problems.append(f"{entry}: 输出里有 {marker!r}")
+    return problems
+
+
+def summarize(values):
+    if not values:
+        return None
+    values = sorted(values)
+    return {"median": statistics.median(values), "p95": values[int(len(values) * 0.95) - 1 if len(values) > 1 else 0],
+            "max": values[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VideoPlayer 反复打开 / 停止的延迟和资源释放检查")
+    parser.add_argument("-n", "--runs", type=int, default=20, help="每个后端停止多少轮")
+    parser.add_argument("-b", "--decode-backend", action="append", help="解码后端，可以给多次（默认 opencv 和 process）")
+    parser.add_argument("--max-stop-call", type=float, default=20.0, help="stop() 本身允许占用主线程的毫秒数")
+    parser.add_argument("--max-gone", type=float, default=1000.0, help="stop() 到 stopped 允许的毫秒数")
+    parser.add_argument("--timeout", type=float, default=20.0, help="每轮等待的秒数")
+    parser.add_argument("--exit-runs", type=int, default=5, help="每个后端通过 oobe.main() 启动再关窗口多少次（launcher 一次）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果写到这个 JSON 文件")
+    parser.add_argument("--exit-child", choices=ENTRY_POINTS, help=argparse.SUPPRESS)
+    parser.add_argument("--close-ms", type=int, default=800, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.exit_child:
+        exit_child(args.exit_child, args.close_ms)
+        return
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ.setdefault("OOBE_FRAME_CACHE", "0")
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    rng = random.Random(args.seed)
+    results = {"python": sys.version.split()[0], "platform": sys.platform, "runs": args.runs, "backends": {}}
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        clip = os.path.join(workdir, "clip.mp4")
+        make_clip(clip, width=640, height=360, seconds=1.0)
+        # 入口启动的首次引导从资源目录找 114514.mp4，片长要够在播放中关窗口
+        make_clip(os.path.join(workdir, "114514.mp4"), seconds=4.0)
+        baseline = threading.active_count()
+        for backend in args.decode_backend or DEFAULT_BACKENDS:
+            samples = {"stop_call": [], "gone": [], "natural": []}
+            problems = []
+            # 随机停在启动中、预缓冲中和播放中，最后一轮自然播完
+            delays = [rng.uniform(0.0, 0.6) for _ in range(args.runs)] + [None]
+            for delay in delays:
+                result, cycle_problems = run_cycle(app, clip, backend, delay, args.timeout)
+                for key, value in result.items():
+                    samples[key].append(value)
+                problems.extend(cycle_problems)
+            if threading.active_count() > baseline:
+                problems.append(f"残留 {threading.active_count() - baseline} 个线程")
+            summary = {key: summarize(values) for key, values in samples.items()}
+            if summary["stop_call"] and summary["stop_call"]["max"] > args.max_stop_call:
+                problems.append(f"stop() 最长占用主线程 {summary['stop_call']['max']:.1f}ms")
+            if summary["gone"] and summary["gone"]["max"] > args.max_gone:
+                problems.append(f"stop() 到 stopped 最长 {summary['gone']['max']:.1f}ms")
+            # 窗口要先显示出来（预卷最多 400ms）才能关，之后随机停在播放中
+            exits = [("oobe", rng.randint(500, 2500)) for _ in range(args.exit_runs)] + [("launcher", 1000)]
+            for entry, close_ms in exits:
+                problems.extend(run_exit(entry, backend, close_ms, workdir, args.timeout))
+            summary["exits"] = len(exits)
+            results["backends"][backend] = dict(summary, problems=sorted(set(problems)))
+
+            print(f"{backend}:")
+            for key, stats in summary.items():
+                if isinstance(stats, dict):
+                    print(f"  {key:10s} 中位数 {stats['median']:8.2f}ms  p95 {stats['p95']:8.2f}ms  "
+                          f"最长 {stats['max']:8.2f}ms")
+            print(f"  通过入口启动再关窗口 {summary['exits']} 次")
+            for problem in sorted(set(problems)):
+                print(f"  问题: {problem}")
+            failed = failed or bool(problems)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+开屏重绘基准：在 offscreen 平台上按给定的屏幕分辨率全屏打开 DH.SplashWindow，不开事件循环，
+按 60 fps 的步长把整段时间轴走一遍，每一步之后处理事件让 Qt 重绘，记录：
+
+    full_paint     整个窗口都脏了（显示、被遮挡后重新露出）时重绘一次的耗时，强制重绘 10 次取中位数
+    paint          每一帧顶层窗口处理 UpdateRequest（绘制脏区域里的所有 widget 并合成）的耗时，取中位数和 p95
+    dirty_mb       每一帧开屏窗口 paintEvent 收到的脏区域大小（按 4 字节 / 像素算，MB），取平均
+    frames         走完时间轴期间实际重绘了多少帧
+
+时间单位都是毫秒。full_mb 是整个窗口一帧的大小，paintEvent 每次都铺满整个窗口时填充量就是它。
+
+    python benchmarks/splash_paint.py                       # 1080p 和 2160p 各跑 3 次
+    python benchmarks/splash_paint.py --size 2560x1440 -n 5 --output splash.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "BENCH_RESULT "
+DEFAULT_SIZES = ("1920x1080", "3840x2160")
+METRICS = ("full_paint", "paint", "paint_p95", "dirty_mb")
+FRAME_MS = 1000 / 60
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+# ---------------------------------------------------------------- 子进程
+
+def child_main():
+    sys.path.insert(0, REPO_DIR)
+    from PySide6.QtCore import QEvent
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    import DH
+
+    frame = {"paint": 0.0, "dirty": 0, "updated": False}
+
+    class ProbedSplash(DH.SplashWindow):
+        def event(self, event):
+            # 顶层窗口处理 UpdateRequest 时绘制所有脏 widget 并合成到 backing store
+            if event.type() != QEvent.UpdateRequest:
+                return super().event(event)
+            start = time.perf_counter()
+            result = super().event(event)
+            frame["paint"] += (time.perf_counter() - start) * 1000
+            frame["updated"] = True
+            return result
+
+        def paintEvent(self, event):
+            frame["dirty"] += sum(rect.width() * rect.height() for rect in event.region())
+            super().paintEvent(event)
+
+    window = ProbedSplash(autostart=False)
+    window.show()
+    app.processEvents()
+    full_paints = []
+    for _ in range(10):
+        frame["paint"] = 0.0
+        window.update()
+        app.processEvents()
+        full_paints.append(frame["paint"])
+
+    dpr = window.devicePixelRatioF()
+    paints, dirty = [], []
+
+    def on_step(_):
+        frame.update(paint=0.0, dirty=0, updated=False)
+        app.processEvents()
+        if frame["updated"]:
+            paints.append(frame["paint"])
+            dirty.append(frame["dirty"] * 4 * dpr * dpr / 1e6)
+
+    window.timeline.seek(0)
+    window.timeline.step_through(FRAME_MS, on_step)
+    full_mb = window.width() * window.height() * 4 * dpr * dpr / 1e6
+    result = {"full_paint": statistics.median(full_paints), "paint": statistics.median(paints), "paint_p95": _percentile(paints, 95),
+              "dirty_mb": statistics.mean(dirty), "full_mb": full_mb, "frames": len(paints),
+              "size": [window.width(), window.height()]}
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ---------------------------------------------------------------- 主进程
+
+def run_size(width, height, workdir, timeout):
+    config = os.path.join(workdir, f"screen_{width}x{height}.json")
+    with open(config, "w", encoding="utf-8") as f:
+        json.dump({"screens": [{"name": "bench", "x": 0, "y": 0, "width": width, "height": height,
+                                "logicalDpi": 96, "dpr": 1}]}, f)
+    env = dict(os.environ, QT_QPA_PLATFORM=f"offscreen:configfile={config}", PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child"], cwd=workdir,
+                          env=env, capture_output=True, text=True, timeout=timeout)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"{width}x{height} 没有输出结果（退出码 {proc.returncode}）:\n{proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="开屏窗口每一帧的重绘耗时和脏区域大小")
+    parser.add_argument("--size", action="append", help="屏幕分辨率，可以给多次（默认 1920x1080 和 3840x2160）")
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0, help="单次运行的超时秒数")
+    parser.add_argument("--output", help="结果写到这个 JSON 文件")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main()
+        return
+
+    results = {"python": sys.version.split()[0], "platform": sys.platform, "runs": args.runs, "sizes": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        for text in args.size or DEFAULT_SIZES:
+            width, height = parse_size(text)
+            try:
+                samples = [run_size(width, height, workdir, args.timeout) for _ in range(args.runs)]
+            except Exception as e:
+                print(f"[{text}] 运行失败 - {e}")
+                results["sizes"][text] = {"error": str(e)}
+                continue
+            median = {name: round(statistics.median(s[name] for s in samples), 3) for name in METRICS}
+            results["sizes"][text] = {"median": median, "samples": samples}
+            print(f"[{text}] full_paint={median['full_paint']:.2f}ms, paint={median['paint']:.3f}ms, paint_p95={median['paint_p95']:.3f}ms, "
+                  f"dirty={median['dirty_mb']:.2f}MB/帧（整帧 {samples[0]['full_mb']:.2f}MB），"
+                  f"frames={samples[0]['frames']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+"""
+启动性能基准：在 QT_QPA_PLATFORM=offscreen 下分别冷启动 DH.py（开屏）和 oobe.py（首次引导），
+用 cv2.VideoWriter 在临时目录生成一段合成的开场视频，记录：
+
+    window_shown      进程启动到窗口显示
+    first_frame       进程启动到第一帧画面画出来（DH 为第一次 paintEvent）
+    empty_window      窗口显示出来到第一帧画出来之间的空窗时间（first_frame - window_shown，launcher 不统计）
+    frame_jitter      帧间隔相对标称帧间隔的标准差
+    gui_lag           OOBE 视频播放期间主线程 5 ms 定时器的延迟 p95（主线程被解码相关的 Python 代码占住多久）
+    compose           OOBE 视频播放期间每次重绘（顶层窗口处理 UpdateRequest：绘制脏区域里的所有 widget 并合成）的中位耗时
+    transition        OOBE 从视频切到欢迎页：video_finished 开始到欢迎页第一次画完（含样式表解析和布局）
+    interactive       进程启动到可交互（OOBE: 视频结束后欢迎页出来；DH: 整段开屏动画播完）
+    close_latency     调用 close() 到窗口关掉
+
+所有时间单位都是毫秒，越小越好。
+
+    python benchmarks/startup.py                          # 两个入口各跑 3 次
+    python benchmarks/startup.py -s oobe -n 5 --output base.json
+    python benchmarks/startup.py --compare base.json      # 和基线对比，有退化时退出码为 1
+
+oobe 场景走真正的入口 oobe.main()；首次引导窗口在 reveal_window() 之前就显示出来时也算失败，退出码为 1。
+    python benchmarks/startup.py -s oobe --decode-backend opencv --decode-backend pyav   # 对比解码后端
+
+各解码后端单独的解码吞吐和首帧时间见 benchmarks/decoders.py，开屏每一帧的重绘耗时见 benchmarks/splash_paint.py。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "BENCH_RESULT "
+SCENARIOS = ("oobe", "dh", "launcher")
+DECODE_BACKENDS = ("auto", "opencv", "pyav", "qtmultimedia", "process")
+METRICS = ("window_shown", "first_frame", "empty_window", "frame_jitter", "gui_lag", "compose", "transition",
+           "interactive", "close_latency")
+LAG_PROBE_INTERVAL_MS = 5
+
+
+def make_clip(path, width=1280, height=720, fps=30, seconds=3.0):
+    """生成一段有运动内容的合成视频，避免编码器把静止画面压得太小、解码太轻松。"""
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError("cv2.VideoWriter 无法创建合成视频")
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    gradient = np.linspace(0, 255, width, dtype=np.uint8)
+    for index in range(int(fps * seconds)):
+        frame[:] = gradient[None, :, None]
+        frame[..., 1] = (index * 4) % 256
+        x = int((width - 200) * index / (fps * seconds))
+        cv2.rectangle(frame, (x, height // 3), (x + 200, height // 3 + 200), (255, 255, 255), -1)
+        cv2.putText(frame, str(index), (40, height - 60), cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 0, 0), 6)
+        writer.write(frame)
+    writer.release()
+
+
+# ---------------------------------------------------------------- 子进程
+
+class _Recorder:
+    def __init__(self, spawn_time):
+        self.spawn_time = spawn_time
+        self.anchor_wall = time.time()
+        self.anchor_perf = time.perf_counter()
+        self.events = {}
+        self.frame_times = []
+        self.lag_samples = []
+        self.compose_samples = []
+
+    def since_spawn(self, perf=None):
+        perf = time.perf_counter() if perf is None else perf
+        return (self.anchor_wall + (perf - self.anchor_perf) - self.spawn_time) * 1000
+
+    def mark(self, name):
+        if name not in self.events:
+            self.events[name] = self.since_spawn()
+
+    def derive_empty_window(self):
+        shown, first = self.events.get("window_shown"), self.events.get("first_frame")
+        if shown is not None and first is not None:
+            self.events["empty_window"] = first - shown
+
+    def gui_lag(self):
+        if not self.lag_samples:
+            return None
+        ordered = sorted(self.lag_samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def compose(self):
+        if not self.compose_samples:
+            return None
+        return statistics.median(self.compose_samples)
+
+    def jitter(self, fps):
+        intervals = [b - a for a, b in zip(self.frame_times, self.frame_times[1:])]
+        if len(intervals) < 2:
+            return None
+        nominal = 1.0 / fps if fps else statistics.mean(intervals)
+        return statistics.pstdev([(i - nominal) * 1000 for i in intervals])
+
+    def emit(self, extra=None):
+        result = {name: self.events.get(name) for name in METRICS}
+        result.update(extra or {})
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+def _install_window_probe(QtCore, window, recorder):
+    class Probe(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Show:
+                recorder.mark("window_shown")
+            return False
+
+    probe = Probe(window)
+    window.installEventFilter(probe)
+    return probe
+
+
+def _probe_oobe_class(oobe, QtCore, recorder):
+    class ProbeOOBEWindow(oobe.OOBEWindow):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            recorder.window = self
+            if getattr(recorder, "timeout", None):
+                # 走 oobe.main() 时 QApplication 由入口创建，超时定时器在这里挂
+                QtCore.QTimer.singleShot(int(recorder.timeout * 1000), QtCore.QCoreApplication.quit)
+
+        def show(self):
+            # 窗口只该由 reveal_window() 显示（预卷完成后滑入），入口提前 show() 算错误
+            if not self._revealed:
+                recorder.events["shown_before_reveal"] = True
+            super().show()
+            recorder.mark("window_shown")
+            # 主线程定时器实际间隔比设定的晚多少，就是主线程被占住的时间
+            self._lag_timer = QtCore.QTimer(self)
+            self._lag_timer.setTimerType(QtCore.Qt.PreciseTimer)
+            self._lag_timer.timeout.connect(self._sample_lag)
+            self._lag_last = time.perf_counter()
+            self._lag_timer.start(LAG_PROBE_INTERVAL_MS)
+
+        def _sample_lag(self):
+            now = time.perf_counter()
+            recorder.lag_samples.append(max(0.0, (now - self._lag_last) * 1000 - LAG_PROBE_INTERVAL_MS))
+            self._lag_last = now
+
+        def event(self, event):
+            # 顶层窗口处理 UpdateRequest 时绘制所有脏 widget 并合成到 backing store
+            if event.type() != QtCore.QEvent.UpdateRequest or not getattr(self, "_lag_timer", None):
+                return super().event(event)
+            start = time.perf_counter()
+            result = super().event(event)
+            recorder.compose_samples.append((time.perf_counter() - start) * 1000)
+            return result
+
+        def _on_frame_available(self):
+            super()._on_frame_available()
+            if self.video_player and self.video_player.current_frame is not None:
+                recorder.frame_times.append(time.perf_counter())
+
+        def _on_video_painted(self):
+            super()._on_video_painted()
+            recorder.mark("first_frame")
+
+        def video_finished(self):
+            if getattr(self, "_lag_timer", None):
+                self._lag_timer.stop()
+                self._lag_timer = None
+            self._transition_start = time.perf_counter()
+            self.welcome_page.installEventFilter(self)
+            super().video_finished()
+            # 切页之后事件循环第一次空下来，视为可交互
+            QtCore.QTimer.singleShot(0, self._mark_interactive)
+
+        def eventFilter(self, obj, event):
+            if obj is self.welcome_page and event.type() == QtCore.QEvent.Paint:
+                if "transition" not in recorder.events:
+                    # 等这次绘制真正做完再记时间
+                    QtCore.QTimer.singleShot(0, self._mark_transition)
+            return super().eventFilter(obj, event)
+
+        def _mark_transition(self):
+            recorder.events.setdefault("transition", (time.perf_counter() - self._transition_start) * 1000)
+
+        def _mark_interactive(self):
+            if "interactive" in recorder.events:
+                return
+            recorder.mark("interactive")
+            QtCore.QTimer.singleShot(50, self._measure_close)
+
+        def _measure_close(self):
+            app = QtCore.QCoreApplication.instance()
+            fps = self.video_player.fps if self.video_player else 0
+            start = time.perf_counter()
+            self.close()
+            app.processEvents()
+            recorder.events["close_latency"] = (time.perf_counter() - start) * 1000
+            recorder.events["frame_jitter"] = recorder.jitter(fps)
+            recorder.events["gui_lag"] = recorder.gui_lag()
+            recorder.events["compose"] = recorder.compose()
+            app.quit()
+
+    return ProbeOOBEWindow
+
+
+def run_oobe_child(recorder, timeout):
+    """走真正的入口 oobe.main()，只把 OOBEWindow 换成带探针的子类。"""
+    sys.path.insert(0, REPO_DIR)
+    import oobe
+    from PySide6 import QtCore
+
+    oobe.OOBEWindow = _probe_oobe_class(oobe, QtCore, recorder)
+    recorder.window = None
+    recorder.timeout = timeout
+    sys.argv = sys.argv[:1]
+    try:
+        oobe.main()
+    except SystemExit:
+        pass
+    recorder.derive_empty_window()
+    # 播完时 RenderGovernor 停在哪一档，只记进样本，不参与对比
+    governor = recorder.window.render_governor if recorder.window else None
+    recorder.emit({"frames": len(recorder.frame_times), "render_tier": governor.tier_name if governor else None,
+                   "shown_before_reveal": recorder.events.get("shown_before_reveal", False)})
+
+
+def run_launcher_child(recorder, timeout):
+    """单进程启动器：window_shown 是开屏出来，first_frame / interactive 是开屏之后 OOBE 的。"""
+    sys.path.insert(0, REPO_DIR)
+    import oobe
+    import launcher
+    from PySide6 import QtCore
+
+    oobe.OOBEWindow = _probe_oobe_class(oobe, QtCore, recorder)
+    runner = launcher.Launcher(sys.argv[:1])
+    recorder.mark("window_shown")
+    runner.splash.finished.connect(lambda: recorder.mark("splash_finished"))
+    QtCore.QTimer.singleShot(int(timeout * 1000), runner.app.quit)
+    runner.run()
+    recorder.emit({"frames": len(recorder.frame_times),
+                   "splash_finished": recorder.events.get("splash_finished")})
+
+
+def run_dh_child(recorder, timeout):
+    sys.path.insert(0, REPO_DIR)
+    import DH
+
+    # 和 DH 用同一套 Qt 绑定
+    QtCore = sys.modules[DH.QTimer.__module__]
+    app = DH.QApplication(sys.argv[:1])
+
+    class ProbeSplashWindow(DH.SplashWindow):
+        def paintEvent(self, event):
+            super().paintEvent(event)
+            recorder.mark("first_frame")
+            recorder.frame_times.append(time.perf_counter())
+
+        def closeEvent(self, event):
+            start = time.perf_counter()
+            super().closeEvent(event)
+            recorder.mark("interactive")
+            recorder.events["close_latency"] = (time.perf_counter() - start) * 1000
+            QtCore.QTimer.singleShot(0, app.quit)
+
+    window = ProbeSplashWindow()
+    probe = _install_window_probe(QtCore, window, recorder)
+    if window.isVisible():
+        recorder.mark("window_shown")
+    QtCore.QTimer.singleShot(int(timeout * 1000), app.quit)
+    app.exec()
+    # 开屏没有固定帧率，这里的抖动是相对平均重绘间隔
+    recorder.events["frame_jitter"] = recorder.jitter(0)
+    recorder.derive_empty_window()
+    recorder.emit({"paints": len(recorder.frame_times)})
+    del probe
+
+
+def child_main(args):
+    recorder = _Recorder(args.spawn_time)
+    if args.child == "oobe":
+        run_oobe_child(recorder, args.timeout)
+    elif args.child == "launcher":
+        run_launcher_child(recorder, args.timeout)
+    else:
+        run_dh_child(recorder, args.timeout)
+
+
+# ---------------------------------------------------------------- 父进程
+
+def run_scenario(scenario, workdir, timeout, env):
+    spawn_time = time.time()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", scenario,
+         "--spawn-time", repr(spawn_time), "--timeout", str(timeout)],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=timeout + 30)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"{scenario} 没有输出结果（退出码 {proc.returncode}）:\n{proc.stderr[-2000:]}")
+
+
+def summarize(samples):
+    summary = {}
+    for name in METRICS:
+        values = [s[name] for s in samples if s.get(name) is not None]
+        summary[name] = round(statistics.median(values), 2) if values else None
+    return summary
+
+
+def report_two_step(scenarios):
+    """
+    对比两种启动方式到 OOBE 第一帧的冷启动耗时：
+    两步 = DH 进程跑完开屏 + 再冷启动一个 oobe 进程到第一帧；单进程 = launcher 里开屏之后直接出 OOBE。
+    """
+    dh, oobe, single = (scenarios.get(name, {}).get("median") for name in ("dh", "oobe", "launcher"))
+    if not (dh and oobe and single):
+        return
+    if None in (dh["interactive"], oobe["first_frame"], single["first_frame"]):
+        return
+    two_step = dh["interactive"] + oobe["first_frame"]
+    print(f"开屏 + OOBE 到第一帧: 两个进程 {two_step:.1f} ms, 单进程启动器 {single['first_frame']:.1f} ms "
+          f"(差 {two_step - single['first_frame']:+.1f} ms)")
+
+
+def report_backends(scenarios):
+    """同一场景不同解码后端的主线程抖动并排打印。"""
+    for scenario in SCENARIOS:
+        rows = [(backend, scenarios.get(scenario_key(scenario, backend), {}).get("median"))
+                for backend in DECODE_BACKENDS]
+        rows = [(backend, median) for backend, median in rows if median]
+        if len(rows) < 2:
+            continue
+        print(f"{scenario} 解码后端对比:")
+        for backend, median in rows:
+            values = ", ".join(f"{name}={median[name]:.1f}ms" if median[name] is not None else f"{name}=n/a"
+                               for name in ("frame_jitter", "gui_lag", "first_frame"))
+            print(f"  {backend:<12} {values}")
+
+
+def scenario_key(scenario, backend):
+    return scenario if backend == "auto" else f"{scenario}@{backend}"
+
+
+def compare(results, baseline, threshold):
+    """逐项对比，比基线慢超过 threshold 比例的指标算退化，返回退化列表。"""
+    regressions = []
+    for scenario, metrics in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(scenario)
+        if not old or "error" in metrics or "error" in old:
+            continue
+        for name in METRICS:
+            new_value, old_value = metrics["median"].get(name), old["median"].get(name)
+            if new_value is None or not old_value:
+                continue
+            change = new_value / old_value - 1
+            flag = "  <-- 退化" if change > threshold else ""
+            print(f"{scenario:>5} {name:<14} {old_value:>9.1f} -> {new_value:>9.1f} ms ({change * 100:+.1f}%){flag}")
+            if flag:
+                regressions.append((scenario, name, old_value, new_value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DH.py / oobe.py 离屏启动基准")
+    parser.add_argument("-s", "--scenario", action="append", choices=SCENARIOS)
+    parser.add_argument("-n", "--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=20.0, help="单次运行的超时秒数")
+    parser.add_argument("--frame-cache", action="store_true", help="启用开场视频帧缓存（先预热一次）")
+    parser.add_argument("--decode-backend", action="append", choices=DECODE_BACKENDS,
+                        help="OOBE 的视频解码后端，可以给多次分别跑（默认 auto）")
+    parser.add_argument("--output", help="结果写到这个 JSON 文件")
+    parser.add_argument("--compare", help="和之前保存的 JSON 结果对比")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允许变慢的比例")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--spawn-time", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args)
+        return
+
+    scenarios = args.scenario or list(SCENARIOS)
+    backends = args.decode_backend or ["auto"]
+    results = {"python": sys.version.split()[0], "platform": sys.platform, "runs": args.runs, "scenarios": {}}
+    problems = []
+    with tempfile.TemporaryDirectory() as workdir:
+        make_clip(os.path.join(workdir, "114514.mp4"))
+        # 设置目录指到临时目录，启动器每次都会走首次引导
+        config_dir = os.path.join(workdir, "config")
+        # 资源目录先查临时目录，用合成视频而不是仓库里的 114514.mp4
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen", PYTHONDONTWRITEBYTECODE="1",
+                   XDG_CONFIG_HOME=config_dir, APPDATA=config_dir, OOBE_ASSET_DIR=workdir)
+        # 缓存目录（预缩放图片，开了 --frame-cache 时还有帧缓存）也指到临时目录
+        cache_dir = os.path.join(workdir, "cache")
+        env.update(XDG_CACHE_HOME=cache_dir, LOCALAPPDATA=cache_dir)
+        env["OOBE_FRAME_CACHE"] = "1" if args.frame_cache else "0"
+
+        runs = [(scenario, backend) for scenario in scenarios for backend in backends
+                if backend == "auto" or scenario != "dh"]
+        for scenario, backend in runs:
+            key = scenario_key(scenario, backend)
+            run_env = dict(env, OOBE_DECODE_BACKEND=backend)
+            try:
+                if args.frame_cache and scenario == "oobe":
+                    run_scenario(scenario, workdir, args.timeout, run_env)
+                samples = [run_scenario(scenario, workdir, args.timeout, run_env) for _ in range(args.runs)]
+            except Exception as e:
+                print(f"{key}: 运行失败 - {e}")
+                results["scenarios"][key] = {"error": str(e)}
+                continue
+            median = summarize(samples)
+            results["scenarios"][key] = {"median": median, "samples": samples}
+            if any(sample.get("shown_before_reveal") for sample in samples):
+                print(f"{key}: 首次引导窗口在 reveal_window() 之前就显示了")
+                problems.append(key)
+            print(f"[{key}] " + ", ".join(
+                f"{name}={value:.1f}ms" if value is not None else f"{name}=n/a" for name, value in median.items()))
+
+    report_two_step(results["scenarios"])
+    report_backends(results["scenarios"])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            print("发现性能退化")
+            sys.exit(1)
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+切换主题的开销：在一个摆满控件的主窗口和搭好欢迎页的首次引导窗口上来回切换浅色 / 深色，记录：
+
+    main_legacy    以前的做法：每次新建 QPalette 逐个 setColor 再 setPalette
+    main_switch    MainWindow.update_window_style()，设置缓存好的调色板
+    main_noop      主题没变时再调用一次 update_window_style()
+    oobe_legacy    以前的做法：格式化 mainWidget 和欢迎页的样式表再 setStyleSheet（mainWidget 的会重新套用整棵子树）
+    oobe_switch    OOBEWindow.apply_theme()，只切 theme 属性、换叶子控件的样式表
+    burst          下拉框连续改 --burst 次主题（最后一次和开始时不同）经 SettingsBus 合并后应用
+
+时间单位都是毫秒，都包含随后一次 processEvents()。burst 同时报告主窗口实际换了几次调色板。
+
+    python benchmarks/theme_switch.py
+    python benchmarks/theme_switch.py -n 50 --widgets 500 --output theme.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+RESULT_PREFIX = "BENCH_RESULT "
+
+
+def _ms(start, end):
+    return (end - start) * 1000
+
+
+def populate(window, count):
+    """主窗口里按网格摆 count 个常见控件。"""
+    from PySide6.QtWidgets import QCheckBox, QComboBox, QGridLayout, QLabel, QLineEdit, QPushButton, QWidget
+
+    central = QWidget()
+    layout = QGridLayout(central)
+    makers = [lambda i: QLabel(f"标签 {i}"), lambda i: QPushButton(f"按钮 {i}"),
+              lambda i: QCheckBox(f"选项 {i}"), lambda i: QLineEdit(f"文本 {i}"),
+              lambda i: QComboBox()]
+    for index in range(count):
+        layout.addWidget(makers[index % len(makers)](index), index // 10, index % 10)
+    window.setCentralWidget(central)
+
+
+def legacy_palette(name):
+    from PySide6.QtGui import QColor, QPalette
+    from themes import PALETTE_COLORS, _rgb
+
+    palette = QPalette()
+    for role, value in PALETTE_COLORS[name].items():
+        palette.setColor(getattr(QPalette, role), QColor(*_rgb(value)))
+    return palette
+
+
+def legacy_oobe_style(window, name):
+    from themes import PALETTE_COLORS, STYLESHEETS, _rgb
+
+    bg = _rgb(PALETTE_COLORS[name]["Window"])
+    text = _rgb(PALETTE_COLORS[name]["WindowText"])
+    window.main_widget.setStyleSheet(f"""
+        #mainWidget {{
+            background-color: transparent;
+            border-radius: 12px;
+        }}
+        #mainWidget[introFinished="true"] {{
+            background-color: rgba({bg[0]}, {bg[1]}, {bg[2]}, 0.95);
+            border: 1px solid rgba({text[0]}, {text[1]}, {text[2]}, 0.1);
+        }}
+    """)
+    args = {"text": "{}, {}, {}".format(*text)}
+    window.title_label.setStyleSheet(STYLESHEETS["title"].format(**args))
+    window.desc_label.setStyleSheet(STYLESHEETS["desc"].format(**args))
+    window.start_button.setStyleSheet(STYLESHEETS["startButton"].format(**args))
+
+
+def child_main(args):
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PySide6.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+
+    import oobe
+    from themes import get_theme
+
+    main_window = oobe.MainWindow()
+    populate(main_window, args.widgets)
+    main_window.show()
+    oobe_window = oobe.OOBEWindow(main_window)
+    # 直接跳到欢迎页，视频不参与
+    oobe_window.video_finished()
+    app.processEvents()
+
+    samples = {name: [] for name in ("main_legacy", "main_switch", "main_noop", "oobe_legacy", "oobe_switch")}
+
+    def timed(label, func):
+        start = time.perf_counter()
+        func()
+        app.processEvents()
+        samples[label].append(_ms(start, time.perf_counter()))
+
+    names = ["Dark", "Light"]
+    for index in range(args.runs * 2):
+        name = names[index % 2]
+        timed("main_legacy", lambda: main_window.setPalette(legacy_palette(name)))
+    main_window.theme = None
+    for index in range(args.runs * 2):
+        name = names[index % 2]
+        timed("main_switch", lambda: main_window.update_window_style({"theme_config": name}))
+        timed("main_noop", lambda: main_window.update_window_style({"theme_config": name}))
+    for index in range(args.runs * 2):
+        name = names[index % 2]
+        timed("oobe_legacy", lambda: legacy_oobe_style(oobe_window, name))
+    oobe_window.main_widget.setStyleSheet(oobe.main_widget_stylesheet())
+    oobe_window._style_welcome_page()
+    app.processEvents()
+    for index in range(args.runs * 2):
+        timed("oobe_switch", lambda: oobe_window.apply_theme(get_theme(names[index % 2])))
+
+    # 下拉框滚动：一串 currentTextChanged 在同一轮事件循环里到达
+    applied = []
+    original = main_window.apply_theme
+    main_window.apply_theme = lambda theme: (theme is not main_window.theme and applied.append(theme), original(theme))
+    bursts = []
+    for index in range(args.runs):
+        target = names[index % 2]
+        sequence = [names[(index + step + 1) % 2] for step in range(args.burst - 1)] + [target]
+        start = time.perf_counter()
+        for name in sequence:
+            oobe_window.on_theme_changed(name)
+        app.processEvents()
+        bursts.append(_ms(start, time.perf_counter()))
+
+    result = {label: statistics.median(values) for label, values in samples.items()}
+    result["burst"] = statistics.median(bursts)
+    result["burst_applied"] = len(applied) / args.runs
+    oobe_window.close()
+    print(RESULT_PREFIX + json.dumps(result))
+
+
+def run_child(args, workdir):
+    import subprocess
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", XDG_CONFIG_HOME=workdir, APPDATA=workdir,
+               XDG_CACHE_HOME=workdir, LOCALAPPDATA=workdir, OOBE_FRAME_CACHE="0")
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", "-n", str(args.runs),
+           "--widgets", str(args.widgets), "--burst", str(args.burst)]
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=300)
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"子进程没有输出结果（退出码 {proc.returncode}）: {proc.stderr[-2000:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浅色 / 深色主题来回切换的耗时")
+    parser.add_argument("-n", "--runs", type=int, default=20, help="每种做法切换多少个来回")
+    parser.add_argument("--widgets", type=int, default=200, help="主窗口里摆多少个控件")
+    parser.add_argument("--burst", type=int, default=8, help="一串连续修改的长度")
+    parser.add_argument("--output", help="结果写到这个 JSON 文件")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        result = run_child(args, workdir)
+    print(f"主窗口（{args.widgets} 个控件）: 以前 {result['main_legacy']:.2f}ms，"
+          f"缓存的调色板 {result['main_switch']:.2f}ms，主题没变 {result['main_noop'] * 1000:.1f}us")
+    print(f"首次引导欢迎页: 以前 {result['oobe_legacy']:.2f}ms，切 theme 属性 {result['oobe_switch']:.2f}ms")
+    print(f"连续 {args.burst} 次修改: {result['burst']:.2f}ms，主窗口实际换了 {result['burst_applied']:g} 次调色板")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(dict(result, widgets=args.widgets, runs=args.runs), f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+子进程解码：OpenCV 在单独的进程里解码、缩放，帧写进 multiprocessing.shared_memory 上的环形槽位，
+通过一条 Pipe 只传很小的控制消息，GUI 进程这边直接把槽位包成 numpy 视图 / QImage，不做拷贝。
+
+控制消息（都是 tuple）:
+    子进程 -> GUI   ("info", fps, 宽, 高, 总帧数) / ("frame", 槽位, pts, 宽, 高) / ("end",) / ("error", 说明)
+    GUI -> 子进程   ("ring", 共享内存名, 槽位数, 每槽字节数) / ("free", 槽位) / ("target", 宽, 高, 设备像素比) / ("stop",)
+
+这个模块不依赖 Qt，子进程用 spawn 启动，只导入这里、video_backends 和 cv2 / numpy。
+multiprocessing 导入要二十毫秒左右，和 cv2 一样用到时才导入，不拖慢 oobe 的启动。
+"""
+import time
+import threading
+from collections import deque
+
+from video_backends import OpenCVBackend, fit_size
+
+START_TIMEOUT = 10.0
+START_POLL = 0.05
+STOP_TIMEOUT = 1.0
+
+
+def _fit_slot(width, height, slot_bytes):
+    """播放中途目标变大、一个槽位放不下时，按比例缩小到放得下为止。"""
+    if width * height * 3 <= slot_bytes:
+        return width, height
+    scale = (slot_bytes / (width * height * 3)) ** 0.5
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _worker_main(video_path, conn, target):
+    import numpy as np
+    from multiprocessing import shared_memory
+
+    decoder = OpenCVBackend(video_path)
+    shm = None
+    try:
+        if not decoder.open():
+            conn.send(("error", f"无法打开视频文件: {video_path}"))
+            return
+        conn.send(("info", decoder.fps, decoder.width, decoder.height, decoder.frame_count))
+
+        # GUI 分配好共享内存之前也可能先发来目标尺寸
+        while True:
+            kind, *args = conn.recv()
+            if kind == "ring":
+                name, slot_count, slot_bytes = args
+                break
+            if kind == "target":
+                target = tuple(args) if args else None
+            elif kind == "stop":
+                return
+        shm = shared_memory.SharedMemory(name=name)
+        free = deque(range(slot_count))
+        index = 0
+
+        while True:
+            # 先处理 GUI 发来的消息；没有空槽位时阻塞等 GUI 还回来
+            while not free or conn.poll():
+                kind, *args = conn.recv()
+                if kind == "free":
+                    free.append(args[0])
+                elif kind == "target":
+                    target = tuple(args) if args else None
+                elif kind == "stop":
+                    return
+
+            if not decoder.grab():
+                break
+            pts = decoder.pts(index)
+            index += 1
+
+            dst_w, dst_h, _ = fit_size(decoder.width, decoder.height, target)
+            dst_w, dst_h = _fit_slot(dst_w, dst_h, slot_bytes)
+            slot = free.popleft()
+            view = np.ndarray((dst_h, dst_w, 3), dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            ok = decoder.retrieve(view)
+            del view
+            if not ok:
+                free.append(slot)
+                continue
+            conn.send(("frame", slot, pts, dst_w, dst_h))
+
+        conn.send(("end",))
+        # 等 GUI 说停再退出，槽位里的帧可能还在显示
+        while conn.recv()[0] != "stop":
+            pass
+    except (EOFError, OSError):
+        # GUI 进程已经关掉了管道
+        pass
+    except Exception as e:
+        try:
+            conn.send(("error", str(e)))
+        except (EOFError, OSError):
+            pass
+    finally:
+        decoder.close()
+        if shm is not None:
+            shm.close()
+        conn.close()
+
+
+class ProcessDecoder:
+    """
+    GUI 进程这一侧的子进程解码器。start() 启动子进程并等它报告视频信息，然后按目标尺寸分配共享内存环；
+    recv() 只能在一个线程里调用（VideoPlayer 的解码线程），free() / set_target() 可以在任意线程调用。
+    stop() 让子进程退出，close() 再释放共享内存，两者都可以重复调用。
+    """
+
+    def __init__(self, video_path, target=None, slot_count=10):
+        self.video_path = video_path
+        self.target = target
+        self.slot_count = max(2, int(slot_count))
+        self.slot_bytes = 0
+        self.fps = 30.0
+        self.width = 0
+        self.height = 0
+        self.frame_count = 0
+        self._shm = None
+        self._process = None
+        self._conn = None
+        self._send_lock = threading.Lock()
+
+    def start(self, timeout=START_TIMEOUT, cancel=None):
+        """
+        启动子进程，返回 (fps, 宽, 高)；子进程打不开视频、超时或者 cancel（threading.Event）被设置时抛 RuntimeError。
+        等子进程报告视频信息时每 50 ms 看一次 cancel，取消不用等满 timeout。
+        """
+        import multiprocessing
+        from multiprocessing import shared_memory
+
+        # 不能 fork 带着 Qt 线程的进程
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_worker_main, args=(self.video_path, child_conn, self.target),
+                                        name="oobe-video-decoder", daemon=True)
+        self._process.start()
+        child_conn.close()
+
+        message = None
+        deadline = time.monotonic() + timeout
+        while message is None and time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                self.stop()
+                raise RuntimeError("已取消")
+            message = self.recv(min(START_POLL, max(0.0, deadline - time.monotonic())))
+        if message is None or message[0] != "info":
+            self.stop()
+            detail = message[1] if message and message[0] == "error" else "子进程没有响应"
+            raise RuntimeError(detail)
+        _, self.fps, self.width, self.height, self.frame_count = message
+
+        # 槽位按原始尺寸和当前目标尺寸里大的那个分配
+        dst_w, dst_h, _ = fit_size(self.width, self.height, self.target)
+        self.slot_bytes = max(self.width * self.height, dst_w * dst_h) * 3
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slot_count)
+        self._send(("ring", self._shm.name, self.slot_count, self.slot_bytes))
+        return self.fps, self.width, self.height
+
+    def frame_array(self, slot, width, height):
+        import numpy as np
+        return np.ndarray((height, width, 3), dtype=np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+
+    def recv(self, timeout):
+        """等一条子进程的消息，超时返回 None；管道断了返回 ("error", ...)。"""
+        conn = self._conn
+        if conn is None:
+            return ("error", "解码子进程已停止")
+        try:
+            if not conn.poll(timeout):
+                return None
+            return conn.recv()
+        except (EOFError, OSError) as e:
+            return ("error", f"解码子进程已退出: {e}")
+
+    def free(self, slot):
+        self._send(("free", slot))
+
+    def set_target(self, target):
+        self.target = target
+        self._send(("target",) + tuple(target) if target else ("target",))
+
+    def _send(self, message):
+        with self._send_lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.send(message)
+            except (EOFError, OSError):
+                # 子进程已经退出，槽位也不用还了
+                pass
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        with self._send_lock:
+            process, self._process = self._process, None
+        if process is None:
+            return
+        self._send(("stop",))
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join(timeout)
+        with self._send_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def close(self):
+        """停掉子进程并释放共享内存。还有 QImage / numpy 视图引用时 close 不掉，交给垃圾回收，但一定会 unlink。"""
+        self.stop()
+        with self._send_lock:
+            shm, self._shm = self._shm, None
+        if shm is None:
+            return
+        try:
+            shm.close()
+        except BufferError:
+            pass
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,44 @@
+"""
+磁盘缓存共用的部分：缓存根目录，和按最近使用时间淘汰旧文件。
+帧缓存（frame_cache）、预缩放图片（thumbnail_cache）、字体解析结果（fonts）都放在同一个根目录下。
+"""
+import os
+import sys
+
+APP_DIR = "WallpaperGeneratorOOBE"
+
+
+def cache_path(*parts):
+    """缓存根目录下的路径：Windows 在 LOCALAPPDATA 下，其它系统在 XDG_CACHE_HOME（默认 ~/.cache）下。"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, APP_DIR, *parts)
+
+
+def prune_lru(directory, suffix, max_bytes, keep=None):
+    """directory 里以 suffix 结尾的文件总大小超过 max_bytes 时，从最久没修改的开始删，keep 指定的文件不删。"""
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(suffix)]
+    except OSError:
+        return
+    entries = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
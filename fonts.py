@@ -0,0 +1,205 @@
+"""
+按用途解析字体：每个用途（开屏的 title / subtitle，首次引导的 body）有一串候选字体，
+用 QFontDatabase 查一次哪个真的装了，主字体没有中文字形时再明确接上一个中文字体，
+排版时 Qt 就不用再为 CJK 字符去做一遍 fontconfig 回退查找。
+
+    resolver = default_font_resolver()
+    resolver.font("title")                      # 按候选字体自己的字号
+    resolver.font("body", 12, QFont.Bold)
+
+解析结果按用途缓存在内存里，同时写进缓存目录下的 fonts.json，连同系统字体目录的修改时间一起存下来。
+下次启动时字体目录都没变、Qt 版本也没变就直接用缓存，不加载字体数据库；装了或卸载了字体
+（字体目录和它的下一级子目录的修改时间会变）就重新解析。环境变量 OOBE_FONT_CACHE=0 时不读写磁盘。
+prewarm() 把固定的文字先画一遍，字体数据库初始化、字形光栅化都发生在动画开始之前。
+解析要在 QGuiApplication 创建之后。
+"""
+import os
+import sys
+import json
+import threading
+
+from disk_cache import cache_path
+
+# 缓存格式版本，ROLES 有变化时加一
+CACHE_VERSION = 2
+CACHE_FILE = "fonts.json"
+
+# 用途 -> [(字体, 字号), ...]，按顺序取第一个装了的；字号为 None 时由调用方给
+ROLES = {
+    "title": [("Bahnschrift SemiCondensed", 58), ("Microsoft YaHei UI", 48), ("Arial", 48)],
+    "subtitle": [("Bahnschrift SemiCondensed", 34), ("Microsoft YaHei UI", 24), ("Arial", 24)],
+    "body": [("Arial", None), ("Microsoft YaHei UI", None)],
+}
+# 主字体没有简体中文字形时接在后面的字体
+CJK_FAMILIES = ["Microsoft YaHei UI", "Microsoft YaHei", "PingFang SC", "Noto Sans CJK SC",
+                "Source Han Sans SC", "WenQuanYi Micro Hei"]
+DEFAULT_POINT_SIZE = 12
+
+
+def default_cache_path():
+    return cache_path(CACHE_FILE)
+
+
+def font_directories():
+    """系统和当前用户的字体目录（不检查是否存在）。"""
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR") or r"C:\Windows"
+        local = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    data_dirs = (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(os.pathsep)
+    return [os.path.join(data_home, "fonts"), os.path.join(home, ".fonts")] + \
+        [os.path.join(path, "fonts") for path in data_dirs if path]
+
+
+def font_directory_stamps(directories=None):
+    """
+    字体目录和它们下一级子目录的修改时间 {路径: mtime_ns}，不存在的目录不列出。
+    装字体一般是往这些目录里加文件或者加一个子目录，都会改到其中某个的修改时间。
+    """
+    stamps = {}
+    for directory in directories if directories is not None else font_directories():
+        try:
+            stamps[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        stamps[entry.path] = entry.stat().st_mtime_ns
+        except OSError:
+            continue
+    return stamps
+
+
+class FontResolver:
+    """
+    用途 -> {"families": [主字体, 中文字体...], "point_size": 字号} 的解析和缓存。只能在 GUI 线程使用。
+    cache_path 为 None 时只在内存里缓存。
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self._resolved = None
+        self._stamps = None
+        self._installed = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from PySide6.QtCore import qVersion
+
+        self._resolved = {}
+        if not self.cache_path:
+            return
+        self._stamps = font_directory_stamps()
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # 字体目录都没变时缓存里的字体一定还在，不再用 QFontDatabase 核对（那会加载整个字体数据库）
+        if data.get("version") == CACHE_VERSION and data.get("qt") == qVersion() \
+                and data.get("dirs") == self._stamps and isinstance(data.get("roles"), dict):
+            self._resolved = data["roles"]
+
+    def _save(self):
+        from PySide6.QtCore import qVersion
+
+        if not self.cache_path:
+            return
+        data = {"version": CACHE_VERSION, "qt": qVersion(), "dirs": self._stamps, "roles": self._resolved}
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"保存字体缓存失败: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _installed_families(self):
+        # 用 families() 而不是 hasFamily()：systemFont() 给的 "Sans Serif" 这类别名 hasFamily 是假的
+        from PySide6.QtGui import QFontDatabase
+
+        if self._installed is None:
+            self._installed = set(QFontDatabase.families())
+        return self._installed
+
+    def _resolve(self, role):
+        from PySide6.QtGui import QFontDatabase
+
+        candidates = ROLES[role]
+        installed = self._installed_families()
+        family, point_size = next(((name, size) for name, size in candidates if name in installed),
+                                  (QFontDatabase.systemFont(QFontDatabase.GeneralFont).family(), candidates[-1][1]))
+        families = [family]
+        if QFontDatabase.SimplifiedChinese not in QFontDatabase.writingSystems(family):
+            cjk = next((name for name in CJK_FAMILIES if name in installed), None)
+            if cjk is None:
+                cjk = next(iter(QFontDatabase.families(QFontDatabase.SimplifiedChinese)), None)
+            if cjk:
+                families.append(cjk)
+        return {"families": families, "point_size": point_size}
+
+    def families(self, role):
+        """返回 role 解析好的 {"families": [...], "point_size": 字号或 None}。"""
+        with self._lock:
+            if self._resolved is None:
+                self._load()
+            if role not in self._resolved:
+                # 有一个用途要重新解析时把所有用途一起解析了，只写一次磁盘
+                for name in ROLES:
+                    if name not in self._resolved:
+                        self._resolved[name] = self._resolve(name)
+                self._save()
+            return self._resolved[role]
+
+    def font(self, role, point_size=None, weight=None):
+        """
+        role 的 QFont。point_size 为 None 时用候选字体自己的字号；weight 为 None 时 title 用粗体，其它用常规。
+        """
+        from PySide6.QtGui import QFont
+
+        entry = self.families(role)
+        font = QFont()
+        font.setFamilies(entry["families"])
+        font.setPointSize(point_size or entry["point_size"] or DEFAULT_POINT_SIZE)
+        if weight is None:
+            weight = QFont.Bold if role == "title" else QFont.Normal
+        font.setWeight(weight)
+        return font
+
+    @staticmethod
+    def prewarm(font, texts):
+        """把 texts 用 font 在一张临时图上画一遍：排版、字体回退和字形光栅化的开销都在这里付掉。"""
+        from PySide6.QtGui import QFontMetrics, QImage, QPainter
+
+        metrics = QFontMetrics(font)
+        image = QImage(max(1, max(metrics.horizontalAdvance(text) for text in texts)), max(1, metrics.height()),
+                       QImage.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        painter.setFont(font)
+        for text in texts:
+            painter.drawText(0, metrics.ascent(), text)
+        painter.end()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_font_resolver():
+    """进程里共用的一个 FontResolver，第一次调用时创建。"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            cache_path = None
+            if os.environ.get("OOBE_FONT_CACHE", "1") != "0":
+                cache_path = default_cache_path()
+            _default = FontResolver(cache_path)
+        return _default
@@ -0,0 +1,212 @@
+import os
+import mmap
+import struct
+import hashlib
+
+from disk_cache import cache_path, prune_lru
+
+
+# 文件头: 魔数, 格式版本, fps, 帧数, 宽, 高（帧数据是紧挨着的 RGB888，每行没有填充）
+# 版本 2: 帧数据从 BGR888 改成 RGB888
+MAGIC = b"OOBEFRM1"
+CACHE_VERSION = 2
+HEADER = struct.Struct("<8sIdIII")
+CACHE_SUFFIX = ".frames"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+
+
+def default_cache_dir():
+    return cache_path("frames")
+
+
+class CachedClip:
+    """
+    mmap 打开的一份帧缓存，frame(i) 直接返回映射内存上的 numpy 视图，不做任何拷贝。
+    文件头或长度不对时抛 ValueError。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        try:
+            if len(self._map) < HEADER.size:
+                raise ValueError("帧缓存文件太短")
+            magic, version, fps, frame_count, width, height = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != CACHE_VERSION:
+                raise ValueError("帧缓存文件头不匹配")
+            if fps <= 0 or frame_count == 0 or width == 0 or height == 0:
+                raise ValueError("帧缓存元数据无效")
+            self.frame_bytes = width * height * 3
+            if len(self._map) != HEADER.size + frame_count * self.frame_bytes:
+                raise ValueError("帧缓存文件长度不匹配")
+        except Exception:
+            self.close()
+            raise
+        self.fps = fps
+        self.frame_count = frame_count
+        self.width = width
+        self.height = height
+
+    def frame(self, index):
+        import numpy as np
+        offset = HEADER.size + index * self.frame_bytes
+        return np.frombuffer(self._map, dtype=np.uint8, count=self.frame_bytes,
+                             offset=offset).reshape(self.height, self.width, 3)
+
+    def close(self):
+        # 还有 QImage / numpy 视图引用映射内存时关不掉，交给垃圾回收
+        try:
+            self._map.close()
+        except (BufferError, AttributeError):
+            pass
+        self._file.close()
+
+
+class FrameCacheWriter:
+    """
+    边解码边把帧写进临时文件，commit() 时补写文件头并原子替换到正式路径。
+    实际帧数比预计的多、总大小超过上限时放弃，abort() 删除临时文件。
+    """
+
+    def __init__(self, cache, path, fps, width, height):
+        self.cache = cache
+        self.path = path
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.frame_count = 0
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self.tmp_path, "wb")
+        self._file.write(HEADER.pack(MAGIC, CACHE_VERSION, fps, 0, width, height))
+        self.active = True
+
+    def add(self, frame):
+        if not self.active:
+            return
+        if frame.shape != (self.height, self.width, 3):
+            self.abort()
+            return
+        if HEADER.size + (self.frame_count + 1) * frame.nbytes > self.cache.max_bytes:
+            print("帧缓存超过大小上限，不再写入")
+            self.abort()
+            return
+        import numpy as np
+        try:
+            self._file.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+            self.frame_count += 1
+        except OSError as e:
+            print(f"写入帧缓存失败: {e}")
+            self.abort()
+
+    def commit(self):
+        if not self.active:
+            return False
+        self.active = False
+        try:
+            if self.frame_count == 0:
+                raise OSError("没有可写入的帧")
+            self._file.seek(0)
+            self._file.write(HEADER.pack(MAGIC, CACHE_VERSION, self.fps, self.frame_count,
+                                         self.width, self.height))
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+        except OSError as e:
+            print(f"保存帧缓存失败: {e}")
+            self._discard()
+            return False
+        self.cache.prune(keep=self.path)
+        return True
+
+    def abort(self):
+        if self.active:
+            self.active = False
+            self._discard()
+
+    def _discard(self):
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+class FrameCache:
+    """
+    开场视频的磁盘帧缓存：保存已经缩放到绘制尺寸的 RGB 帧，之后启动直接 mmap 播放，不用再解码。
+    缓存键包含视频文件的大小 / 修改时间 / 内容哈希和目标分辨率，任何一项变了自然就找不到旧缓存；
+    缓存目录总大小超过 max_bytes 时按最近使用时间淘汰。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def key(self, video_path, target_size):
+        st = os.stat(video_path)
+        digest = hashlib.sha1()
+        digest.update(f"{CACHE_VERSION}:{st.st_size}:{st.st_mtime_ns}:".encode())
+        digest.update("{}x{}@{:.2f}".format(*target_size).encode())
+        # 只哈希首尾各 1 MB，大文件也不会拖慢启动
+        with open(video_path, "rb") as f:
+            digest.update(f.read(HASH_CHUNK))
+            if st.st_size > 2 * HASH_CHUNK:
+                f.seek(-HASH_CHUNK, os.SEEK_END)
+                digest.update(f.read(HASH_CHUNK))
+        return digest.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_SUFFIX)
+
+    def open(self, video_path, target_size):
+        """找到可用的缓存就返回 CachedClip，缺失或损坏时返回 None（损坏的文件顺便删掉）。"""
+        try:
+            path = self.path_for(self.key(video_path, target_size))
+        except OSError:
+            return None
+        if not os.path.exists(path):
+            return None
+        try:
+            clip = CachedClip(path)
+        except (OSError, ValueError) as e:
+            print(f"帧缓存损坏，改为实时解码: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            # 记录最近使用时间，淘汰时用
+            os.utime(path)
+        except OSError:
+            pass
+        return clip
+
+    def writer(self, video_path, target_size, fps, width, height, frame_count):
+        """
+        开始写一份新缓存。frame_count 是视频的总帧数，整段放不进上限（或者帧数未知）时直接返回 None，
+        不会写到一半才发现超限再删掉；目录不可写时也返回 None。
+        """
+        if frame_count <= 0:
+            return None
+        if HEADER.size + frame_count * width * height * 3 > self.max_bytes:
+            print("开场视频按这个尺寸缓存会超过大小上限，不写帧缓存")
+            return None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.path_for(self.key(video_path, target_size))
+            return FrameCacheWriter(self, path, fps, width, height)
+        except OSError as e:
+            print(f"无法创建帧缓存: {e}")
+            return None
+
+    def prune(self, keep=None):
+        prune_lru(self.cache_dir, CACHE_SUFFIX, self.max_bytes, keep)
@@ -0,0 +1,183 @@
+"""
+可选的逐帧耗时打点，退出时导出 Chrome trace-event 格式的 JSON（chrome://tracing、Perfetto 可以直接打开），
+并打印帧耗时的 p50 / p95 / p99 和丢帧数。
+
+开启方式：环境变量 OOBE_TRACE=trace.json，或者命令行加 --trace / --trace=trace.json。
+没开启时 span() 返回同一个空的上下文管理器，热路径上调用方先判断 frametrace.ENABLED 即可。
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+
+ENABLED = False
+DEFAULT_PATH = "oobe_trace.json"
+
+_path = None
+_origin = time.perf_counter()
+_events = []
+_durations = {}
+_counts = {}
+_lock = threading.Lock()
+_thread_names = {}
+
+
+def _now_us():
+    return (time.perf_counter() - _origin) * 1e6
+
+
+def _tid():
+    ident = threading.get_ident()
+    if ident not in _thread_names:
+        _thread_names[ident] = threading.current_thread().name
+    return ident
+
+
+def enable(path=None):
+    global ENABLED, _path
+    if ENABLED:
+        return
+    _path = path or DEFAULT_PATH
+    ENABLED = True
+    atexit.register(finish)
+
+
+def init_from_argv(argv=None):
+    """根据环境变量和命令行决定是否开启，返回去掉 --trace 参数后的 argv。"""
+    argv = list(sys.argv if argv is None else argv)
+    remaining = []
+    path = os.environ.get("OOBE_TRACE") or None
+    for arg in argv:
+        if arg == "--trace":
+            path = path or DEFAULT_PATH
+        elif arg.startswith("--trace="):
+            path = arg.split("=", 1)[1] or DEFAULT_PATH
+        else:
+            remaining.append(arg)
+    if path:
+        enable(path)
+    return remaining
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, *exc):
+        complete(self.name, self.start, _now_us(), self.cat, self.args)
+        return False
+
+
+def span(name, cat="frame", **args):
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, cat, args or None)
+
+
+def now():
+    """给手动打点用的时间戳（微秒），配合 complete() 使用。"""
+    return _now_us()
+
+
+def complete(name, start_us, end_us, cat="frame", args=None):
+    if not ENABLED:
+        return
+    event = {"name": name, "cat": cat, "ph": "X", "ts": start_us, "dur": end_us - start_us,
+             "pid": os.getpid(), "tid": _tid()}
+    if args:
+        event["args"] = args
+    _events.append(event)
+    with _lock:
+        _durations.setdefault(name, []).append((end_us - start_us) / 1000.0)
+
+
+def instant(name, cat="frame", **args):
+    if not ENABLED:
+        return
+    event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": _now_us(),
+             "pid": os.getpid(), "tid": _tid()}
+    if args:
+        event["args"] = args
+    _events.append(event)
+
+
+def count(name, value=1):
+    """累加计数（比如丢帧），同时在 trace 里记一条计数器事件。"""
+    if not ENABLED:
+        return
+    with _lock:
+        total = _counts.get(name, 0) + value
+        _counts[name] = total
+    _events.append({"name": name, "ph": "C", "ts": _now_us(), "pid": os.getpid(),
+                    "tid": _tid(), "args": {name: total}})
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summary():
+    with _lock:
+        durations = {name: list(values) for name, values in _durations.items()}
+        counts = dict(_counts)
+    return {
+        "durations_ms": {
+            name: {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+                "max": max(values),
+            }
+            for name, values in durations.items() if values
+        },
+        "counts": counts,
+    }
+
+
+def finish():
+    """写出 trace 文件并打印汇总，进程退出时自动调用一次。"""
+    global ENABLED
+    if not ENABLED:
+        return
+    ENABLED = False
+    pid = os.getpid()
+    metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                for tid, name in _thread_names.items()]
+    try:
+        with open(_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + _events, "displayTimeUnit": "ms"}, f)
+        print(f"帧耗时 trace 已写入: {os.path.abspath(_path)}")
+    except OSError as e:
+        print(f"写入 trace 失败: {e}")
+
+    result = summary()
+    print("帧耗时汇总 (ms):")
+    for name, row in sorted(result["durations_ms"].items()):
+        print(f"  {name:<24} n={row['count']:<5} p50={row['p50']:.2f} p95={row['p95']:.2f} "
+              f"p99={row['p99']:.2f} max={row['max']:.2f}")
+    for name, value in sorted(result["counts"].items()):
+        print(f"  {name:<24} {value}")
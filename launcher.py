@@ -0,0 +1,95 @@
+"""
+单进程启动器：同一个 QApplication（PySide6）里先播 DH.py 的开屏动画，
+开屏淡出结束时直接切到首次引导，已经完成过引导的话切到主窗口，不用再起第二个进程。
+
+    python launcher.py            # 正常启动
+    python launcher.py --report   # 额外打印各阶段距离启动的耗时
+"""
+import time
+
+_LAUNCH_TIME = time.perf_counter()
+
+import sys
+
+from settings_store import SettingsStore
+
+
+class Launcher:
+    def __init__(self, argv, report=False):
+        from PySide6.QtWidgets import QApplication
+
+        self.report = report
+        self.timings = {}
+        # 设置不依赖 Qt，先读出来决定开屏之后去哪个窗口
+        self.settings_store = SettingsStore()
+        self.settings_store.load()
+        self.app = QApplication(argv)
+        self.mark("application")
+
+        import DH
+        import oobe
+        self.oobe_module = oobe
+        self.main_window = oobe.MainWindow(self.settings_store.settings)
+        self.oobe_window = None
+        # 退出前限时等首次引导的解码线程收尾
+        self.app.aboutToQuit.connect(self.shut_down)
+
+        self.splash = DH.SplashWindow()
+        self.splash.finished.connect(self.hand_off)
+        self.splash.show()
+        self.mark("splash_shown")
+
+    def mark(self, name):
+        elapsed = (time.perf_counter() - _LAUNCH_TIME) * 1000
+        self.timings[name] = elapsed
+        if self.report:
+            print(f"[launcher] {name}: {elapsed:.1f} ms")
+
+    def hand_off(self):
+        # 开屏还没关，窗口数不会掉到 0，QApplication 不会退出
+        self.mark("splash_finished")
+        if self.settings_store.onboarding_completed:
+            self.main_window.update_window_style(self.main_window.settings)
+            self.main_window.show()
+            self.mark("main_window_shown")
+            return
+
+        # 有视频时 OOBE 预卷完第一帧才显示，这期间开屏可能已经关了，不能因为没有窗口就退出
+        self.app.setQuitOnLastWindowClosed(False)
+        self.oobe_window = self.oobe_module.OOBEWindow(self.main_window, self.settings_store)
+        if self.oobe_window.isVisible():
+            self._on_oobe_revealed()
+        else:
+            self.oobe_window.revealed.connect(self._on_oobe_revealed)
+        player = self.oobe_window.video_player
+        if player:
+            player.frame_available.connect(self._on_first_frame)
+
+    def _on_oobe_revealed(self):
+        self.app.setQuitOnLastWindowClosed(True)
+        self.mark("oobe_shown")
+
+    def _on_first_frame(self):
+        self.oobe_window.video_player.frame_available.disconnect(self._on_first_frame)
+        self.mark("oobe_first_frame")
+
+    def shut_down(self):
+        if self.oobe_window:
+            self.oobe_window.shutdown_video()
+
+    def run(self):
+        return self.app.exec()
+
+
+def main():
+    from oobe import init_entry
+
+    argv = init_entry(sys.argv)
+    report = "--report" in argv
+    argv = [arg for arg in argv if arg != "--report"]
+    launcher = Launcher(argv, report)
+    sys.exit(launcher.run())
+
+
+if __name__ == "__main__":
+    main()
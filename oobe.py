@@ -5,123 +5,1092 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                               QCheckBox, QHBoxLayout, QFileDialog, QLineEdit, QSizePolicy, QGraphicsOpacityEffect)
 from PySide6.QtCore import (Qt, QPropertyAnimation, QTimer, QPoint,
                            QParallelAnimationGroup, QEasingCurve, QSize, QRect,
-                           Signal, QPointF, QObject)
-from PySide6.QtGui import (QPixmap, QFont, QPalette,
-                          QColor, QPainter, QImage, QMouseEvent)
-from threading import Thread, Event
+                           Signal, QPointF, QObject, QRectF, QEvent)
+from PySide6.QtGui import (QFont, QPainter, QImage, QMouseEvent, QPainterPath)
+from threading import Thread, Event, Condition, Lock
+from collections import deque
+from frame_cache import FrameCache
+from decode_process import ProcessDecoder
+from video_backends import available_backends, select_backends, fit_size
+from settings_store import SettingsStore, default_settings
+from settings_bus import SettingsBus
+from themes import get_theme, resolve_theme, main_widget_stylesheet, apply_palette, apply_stylesheet
+from assets import default_resolver
+from fonts import FontResolver, default_font_resolver
+import frametrace
 import time
 
-try:
-    import cv2
-    import numpy as np
-    OPENCV_AVAILABLE = True
-except ImportError:
-    OPENCV_AVAILABLE = False
-    print("警告: OpenCV未安装，将无法播放视频")
+# 解码库（cv2 / PyAV / QtMultimedia）和 numpy 导入都很慢，只在真正要播放视频时才加载（见 load_video_modules）。
+# 这里只查一下有哪些解码后端的模块能找到，不执行任何导入。
+VIDEO_BACKENDS = available_backends()
+if not VIDEO_BACKENDS:
+    print("警告: 没有可用的视频解码后端（OpenCV / PyAV / QtMultimedia），将无法播放视频")
+
+np = None
+_video_modules_lock = Lock()
+
+
+def load_video_modules(backend):
+    """导入解码后端依赖的模块（拉帧的后端还有 numpy），可以在任意线程调用。导入失败返回 False。"""
+    global np
+    with _video_modules_lock:
+        try:
+            backend.load()
+            if np is None and "numpy" in backend.modules:
+                import numpy
+                np = numpy
+        except ImportError as e:
+            print(f"警告: 视频解码后端 {backend.name} 加载失败: {e}")
+            return False
+    return True
+
+
+def preload_video_modules(preferred="auto"):
+    """在后台线程提前导入首选解码后端的模块，主线程不等它。QtMultimedia 要在主线程启动，不预加载。"""
+    backends = select_backends(preferred)
+    if backends and backends[0].pull:
+        Thread(target=load_video_modules, args=(backends[0],), daemon=True).start()
+
+
+def _peak_rss_bytes():
+    """进程峰值常驻内存（字节），平台不支持时返回 None。"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上单位是 KB，macOS 上是字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PresentationClock:
+    """
+    基于 time.perf_counter 的单调播放时钟。
+    start() 之后 elapsed() 返回已经播放的媒体时间（秒），用来和帧时间戳比较，
+    不受 time.time() 被系统调整的影响。
+    """
+
+    def __init__(self):
+        self._start = None
+
+    def start(self, offset=0.0):
+        self._start = time.perf_counter() - offset
+
+    def elapsed(self):
+        if self._start is None:
+            return 0.0
+        return time.perf_counter() - self._start
+
+    def time_until(self, pts):
+        return pts - self.elapsed()
+
+
+class RenderGovernor:
+    """
+    按主线程把一帧送上屏幕的实际耗时自动调节开场视频的渲染质量。
+    record() 记录每帧从主线程取到新帧到 paintEvent 画完的时间（present），每攒够 window 帧取一次 p90，
+    超过预算（显示间隔 * degrade_ratio）就降一级；连续 recover_windows 个窗口都低于 recover_ratio 就升回一级。
+    跳帧以后的显示间隔按实际隔几帧显示一帧算。档位变化后丢掉一个窗口的样本，等旧档位的帧播完再判断。
+
+        full                 解码按区域高质量缩放，绘制时平滑变换
+        fast_transform       解码 / 绘制都改用快速缩放
+        reduced_resolution   解码分辨率降到一半，绘制时再放大
+        skip_frames          再隔一帧显示一帧
+
+    这个类不碰 Qt，档位对应的设置由 OOBEWindow 应用到 VideoPlayer 和 paintEvent 上。
+    """
+    TIERS = ("full", "fast_transform", "reduced_resolution", "skip_frames")
+
+    def __init__(self, window=15, degrade_ratio=0.75, recover_ratio=0.3, recover_windows=3):
+        self.window = window
+        self.degrade_ratio = degrade_ratio
+        self.recover_ratio = recover_ratio
+        self.recover_windows = recover_windows
+        self.tier = 0
+        self.transitions = 0
+        self._samples = []
+        self._calm_windows = 0
+        self._settling = False
+
+    @property
+    def tier_name(self):
+        return self.TIERS[self.tier]
+
+    @property
+    def fast_transform(self):
+        return self.tier >= 1
+
+    @property
+    def decode_scale(self):
+        return 0.5 if self.tier >= 2 else 1.0
+
+    @property
+    def frame_step(self):
+        return 2 if self.tier >= 3 else 1
+
+    def record(self, seconds, frame_interval):
+        """记录一帧的 present 耗时（秒），档位变了时返回 True。"""
+        self._samples.append(seconds)
+        if len(self._samples) < self.window:
+            return False
+        ordered = sorted(self._samples)
+        self._samples.clear()
+        if self._settling:
+            self._settling = False
+            return False
+        p90 = ordered[int(len(ordered) * 0.9)]
+        budget = frame_interval * self.frame_step
+        if p90 > budget * self.degrade_ratio:
+            self._calm_windows = 0
+            if self.tier < len(self.TIERS) - 1:
+                return self._change(self.tier + 1, p90, budget)
+        elif p90 < budget * self.recover_ratio and self.tier > 0:
+            self._calm_windows += 1
+            if self._calm_windows >= self.recover_windows:
+                self._calm_windows = 0
+                return self._change(self.tier - 1, p90, budget)
+        else:
+            self._calm_windows = 0
+        return False
+
+    def _change(self, tier, p90, budget):
+        old = self.tier_name
+        self.tier = tier
+        self.transitions += 1
+        self._settling = True
+        print(f"渲染质量: {old} -> {self.tier_name}（present p90 {p90 * 1000:.1f}ms / 预算 {budget * 1000:.1f}ms）")
+        frametrace.instant("render.tier", cat="ui", tier=self.tier_name, previous=old, p90_ms=round(p90 * 1000, 2))
+        return True
+
+
+class PooledFrame:
+    """
+    FramePool 里的一块帧缓冲：RGB 的 numpy 数组，加上直接引用这块内存的 QImage（Format_RGB888）。
+    用完以后必须调用 release() 还回池里。
+    """
+
+    def __init__(self, pool, array, image):
+        self.pool = pool
+        self.array = array
+        self.image = image
+        self.pts = 0.0
+        self.nbytes = array.nbytes
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.pool.release(self)
+
+
+class MappedFrame:
+    """帧缓存里的一帧：QImage 直接引用 mmap 的内存，release() 什么都不用做。"""
+
+    def __init__(self, array, device_pixel_ratio, pts):
+        height, width = array.shape[:2]
+        self.array = array
+        self.image = QImage(array.data, width, height, width * 3, QImage.Format_RGB888)
+        self.image.setDevicePixelRatio(device_pixel_ratio)
+        self.pts = pts
+        self.nbytes = array.nbytes
+
+    def release(self):
+        pass
+
+
+class ImageFrame:
+    """自己推帧的解码后端（QtMultimedia）送来的一帧：QImage 自己管内存，release() 什么都不用做。"""
+
+    def __init__(self, image, pts):
+        self.image = image
+        self.pts = pts
+        self.nbytes = image.sizeInBytes()
+
+    def release(self):
+        pass
+
+
+class SharedFrame:
+    """
+    子进程解码器（decode_process.ProcessDecoder）共享内存环里的一个槽位：
+    QImage 直接引用共享内存，release() 把槽位还给子进程。同一个槽位的 SharedFrame 循环复用。
+    """
+
+    def __init__(self, decoder, slot, array):
+        height, width = array.shape[:2]
+        self.decoder = decoder
+        self.slot = slot
+        self.array = array
+        self.image = QImage(array.data, width, height, width * 3, QImage.Format_RGB888)
+        self.pts = 0.0
+        self.nbytes = array.nbytes
+        self._released = True
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.decoder.free(self.slot)
+
+
+class FramePool:
+    """
+    预先分配、循环复用的帧缓冲池，解码线程直接解码 / 缩放进池里的缓冲，
+    主线程直接把同一块内存当 QImage 画出来，中间没有颜色转换和拷贝。
+    所有缓冲都在外面时 acquire() 阻塞，帧尺寸变化时旧尺寸的缓冲自动丢弃。
+    """
+
+    def __init__(self, max_buffers=10):
+        self.max_buffers = max(1, int(max_buffers))
+        self._free = []
+        self._shape = None
+        self._outstanding = 0
+        self._cond = Condition()
+        self._closed = False
+        self.allocations = 0
+        self.reuses = 0
+
+    def acquire(self, width, height):
+        """取一块 height x width x 3 的缓冲；池已关闭时返回 None。"""
+        shape = (height, width, 3)
+        with self._cond:
+            if shape != self._shape:
+                self._free.clear()
+                self._shape = shape
+            while not self._closed and not self._free and self._outstanding >= self.max_buffers:
+                self._cond.wait()
+            if self._closed:
+                return None
+            if self._free:
+                frame = self._free.pop()
+                frame._released = False
+                self.reuses += 1
+            else:
+                array = np.empty(shape, dtype=np.uint8)
+                image = QImage(array.data, width, height, width * 3, QImage.Format_RGB888)
+                frame = PooledFrame(self, array, image)
+                self.allocations += 1
+            self._outstanding += 1
+            return frame
+
+    def release(self, frame):
+        with self._cond:
+            self._outstanding -= 1
+            if not self._closed and frame.array.shape == self._shape:
+                self._free.append(frame)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._free.clear()
+            self._cond.notify_all()
+
+
+class FrameQueue:
+    """
+    解码线程和界面线程之间的有界帧缓冲（环形队列）。
+    同时按帧数 max_frames 和字节数 max_bytes 限制：满了解码线程就阻塞等待，
+    界面线程按播放时钟取走已经到点的帧。解码偶尔卡顿时由已缓冲的帧顶上。
+    队列里的帧是 PooledFrame，被跳过或清空的帧由队列负责 release()。
+    """
+
+    def __init__(self, max_frames=8, max_bytes=64 * 1024 * 1024):
+        self.max_frames = max(1, int(max_frames))
+        self.max_bytes = max(1, int(max_bytes))
+        self._frames = deque()
+        self._bytes = 0
+        self._cond = Condition()
+        self._closed = False
+        self.high_water_frames = 0
+        self.high_water_bytes = 0
+
+    @property
+    def depth(self):
+        return len(self._frames)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def put(self, frame):
+        """放入一帧；队列满时阻塞。队列已关闭时返回 False。"""
+        nbytes = frame.nbytes
+        with self._cond:
+            # 队列为空时总是放得进去，避免单帧超过字节预算时死等
+            while not self._closed and self._frames and (
+                    len(self._frames) >= self.max_frames or self._bytes + nbytes > self.max_bytes):
+                self._cond.wait()
+            if self._closed:
+                return False
+            self._frames.append(frame)
+            self._bytes += nbytes
+            self.high_water_frames = max(self.high_water_frames, len(self._frames))
+            self.high_water_bytes = max(self.high_water_bytes, self._bytes)
+            self._cond.notify_all()
+            return True
+
+    def pop_due(self, media_time):
+        """
+        取出所有 pts <= media_time 的帧，返回 (最新到点的帧, 被跳过的帧数)。
+        没有到点的帧时返回 (None, 0)。
+        """
+        latest = None
+        skipped = 0
+        with self._cond:
+            while self._frames and self._frames[0].pts <= media_time:
+                if latest is not None:
+                    latest.release()
+                    skipped += 1
+                latest = self._frames.popleft()
+                self._bytes -= latest.nbytes
+            if latest is not None:
+                self._cond.notify_all()
+        return latest, skipped
+
+    def wait_head(self, timeout):
+        """等待队首帧，返回它的 pts；超时或队列已关闭时返回 None。"""
+        with self._cond:
+            if not self._frames and not self._closed:
+                self._cond.wait(timeout)
+            if self._frames:
+                return self._frames[0].pts
+            return None
+
+    def wait_drained(self):
+        """阻塞到队列被取空或关闭。"""
+        with self._cond:
+            while self._frames and not self._closed:
+                self._cond.wait()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            while self._frames:
+                self._frames.popleft().release()
+            self._bytes = 0
+            self._cond.notify_all()
 
 
 class VideoPlayer(QObject):
     """
-    负责在后台线程用 OpenCV 读取视频帧，并把当前帧放到 self.current_frame（QImage）中。
-    使用 frame_ready Event 标记主线程可以读取 current_frame。
-    新增 video_finished_signal 在视频播放结束时通知主线程。
+    播放开场视频。解码线程用 video_backends 里的后端（或者 decode_process 子进程、frame_cache 的磁盘缓存）取帧，
+    按 set_target_size() 的尺寸缩放进 FramePool 的缓冲，放进有界的 FrameQueue；呈现线程按 PresentationClock
+    把到点的帧放进单帧信箱，用 frame_available 通知主线程 take_frame()。自己推帧的后端（QtMultimedia）直接放进信箱。
+    播完发 video_finished_signal。preroll=True 时缓冲好先发 preroll_ready，等 release_preroll() 才开始走时钟。
+    stop() 不阻塞，线程退出、资源都释放以后发 stopped。
     """
     video_finished_signal = Signal()
-
-    def __init__(self, video_path, parent_window):
+    frame_available = Signal()
+    preroll_ready = Signal()
+    # 线程都退出、资源都释放以后发出，每次播放只发一次
+    stopped = Signal()
+    # 拉帧的后端都打不开时，让主线程去启动自己推帧的后端
+    _start_pushed = Signal(object)
+
+    def __init__(self, video_path, parent_window, queue_frames=8, queue_bytes=64 * 1024 * 1024,
+                 prefill_frames=None, interpolation=None, frame_cache=None, preroll=False,
+                 decode_backend="auto"):
         super().__init__()
         self.video_path = video_path
         self.parent_window = parent_window  # 只用于回调 video_finished()
-        self.cap = None
+        self.decoder = None
+        self.backend_name = None
         self.is_playing = False
         self.current_frame = None
         self.video_width = 0
         self.video_height = 0
-        self.frame_ready = Event()
         self.fps = 30
         self.thread = None
+        self.present_thread = None
+        self.clock = PresentationClock()
+        self.frame_queue = FrameQueue(queue_frames, queue_bytes)
+        # 队列里的帧 + 正在显示的一帧 + 正在解码的一帧
+        self.frame_pool = FramePool(self.frame_queue.max_frames + 2)
+        self._current_buffer = None
+        if prefill_frames is None:
+            prefill_frames = max(1, self.frame_queue.max_frames // 2)
+        self.prefill_frames = prefill_frames
+        self.interpolation = interpolation  # None 表示缩小用 INTER_AREA，放大用 INTER_LINEAR
+        self._target_size = None  # (逻辑宽, 逻辑高, 设备像素比)
+        self.frame_cache = frame_cache
+        self._cached_clip = None
+        self.decode_backend = decode_backend
+        self._backends = []
+        self._process_decoder = None
+        self._pushed_index = 0
+        self._start_pushed.connect(self._play_pushed, Qt.QueuedConnection)
+        self._clock_started = Event()
+        self._preroll_released = not preroll
+        self._preroll_signalled = False
+        self._preroll_lock = Lock()
+        self._stop_event = Event()
+        self._finished = Event()
+        self._finishing = False
+        # 还没收尾的所有者（解码线程、推帧的后端）个数，减到 0 时发 stopped
+        self._owners = 0
+        self._owners_lock = Lock()
+        self._pushed_active = False
+        # stop() 放掉主线程手里的帧以后置位：共享内存、帧缓存要等它以后才能释放
+        self._released = Event()
+        self._decode_done = False
+        self._mailbox = None
+        self._mailbox_lock = Lock()
+        self.presented_frames = 0
+        self.decode_dropped_frames = 0
+        self.present_dropped_frames = 0
+        self.late_frames = 0
+        self.underruns = 0
+        self.skipped_frames = 0
+        self.clip_duration = 0.0
+        self.wall_duration = 0.0
+        # 渲染质量，由 OOBEWindow 的 RenderGovernor 通过 set_render_quality() 调整
+        self.render_tier = RenderGovernor.TIERS[0]
+        self.render_degraded = False
+        self.fast_scaling = False
+        self.decode_scale = 1.0
+        self.frame_step = 1
+
+    def set_target_size(self, width, height, device_pixel_ratio=1.0):
+        """设置绘制区域大小，可以在播放过程中从主线程随时调用。"""
+        if width <= 0 or height <= 0:
+            self._target_size = None
+        else:
+            self._target_size = (int(width), int(height), float(device_pixel_ratio))
+        if self._process_decoder:
+            self._process_decoder.set_target(self._decode_target())
+
+    def set_render_quality(self, tier, fast_scaling=False, decode_scale=1.0, frame_step=1):
+        """
+        调整解码端的渲染质量，可以在播放过程中从主线程随时调用，从下一帧开始生效：
+        fast_scaling 缩放改用快速算法，decode_scale < 1 时按比例降低解码分辨率，frame_step 隔几帧显示一帧。
+        降级以后这次播放不再写帧缓存。
+        """
+        self.render_tier = tier
+        self.fast_scaling = fast_scaling
+        self.decode_scale = decode_scale
+        self.frame_step = max(1, int(frame_step))
+        self.render_degraded = fast_scaling or decode_scale < 1.0 or self.frame_step > 1
+        if self._process_decoder:
+            self._process_decoder.set_target(self._decode_target())
+
+    def _decode_target(self):
+        """实际解码的目标：降低分辨率时逻辑尺寸不变，把设备像素比按比例调小。"""
+        if self._target_size is None or self.decode_scale >= 1.0:
+            return self._target_size
+        width, height, dpr = self._target_size
+        return width, height, dpr * self.decode_scale
+
+    def _fit_size(self, src_w, src_h):
+        """按 KeepAspectRatio 算出目标区域的物理像素尺寸，返回 (宽, 高, 设备像素比)。"""
+        return fit_size(src_w, src_h, self._decode_target())
+
+    def _skip_for_quality(self, index):
+        """跳帧档：每 frame_step 帧只显示一帧，其余的不转换直接跳过。"""
+        if self.frame_step > 1 and index % self.frame_step:
+            self.skipped_frames += 1
+            return True
+        return False
+
+    def _decode_into_pool(self):
+        """把刚 grab 到的帧解码（必要时缩放）进池里的一块缓冲，失败返回 None。"""
+        dst_w, dst_h, dpr = self._fit_size(self.video_width, self.video_height)
+        pooled = self.frame_pool.acquire(dst_w, dst_h)
+        if pooled is None:
+            return None
+        try:
+            if not self.decoder.retrieve(pooled.array, self.interpolation, self.fast_scaling):
+                pooled.release()
+                return None
+        except Exception:
+            pooled.release()
+            raise
+        pooled.image.setDevicePixelRatio(dpr)
+        return pooled
+
+    def _start_clock(self, offset=0.0):
+        if not self._clock_started.is_set():
+            self.clock.start(offset)
+            self._clock_started.set()
+
+    def _prefilled(self, offset=0.0):
+        """
+        解码线程在预缓冲攒够（或者已经解码完）时调用：预卷中只发 preroll_ready，否则从 offset 开始走时钟。
+        推帧的后端每送来一帧都调用，直到时钟开始走。
+        """
+        if self._clock_started.is_set():
+            return
+        with self._preroll_lock:
+            if self._preroll_released:
+                self._start_clock(offset)
+            elif not self._preroll_signalled:
+                self._preroll_signalled = True
+                self.preroll_ready.emit()
+
+    def release_preroll(self):
+        """
+        结束预卷，主线程调用。已经有解码好的帧时把第一帧直接送去显示，时钟从它的 pts 开始走；
+        还一帧都没有时（推帧的后端不经过队列，也是这种情况）只解除等待，
+        解码线程攒够预缓冲后、推帧的后端送来下一帧时自己开始走时钟。
+        """
+        frame = None
+        with self._preroll_lock:
+            self._preroll_released = True
+            if self._clock_started.is_set():
+                return
+            pts = self.frame_queue.wait_head(0)
+            if pts is None:
+                if self._decode_done:
+                    self._start_clock()
+                return
+            frame, _ = self.frame_queue.pop_due(pts)
+            self._start_clock(pts)
+        if frame:
+            frametrace.instant("video.present", pts=frame.pts)
+            self._post_frame(frame)
+
+    def playback_stats(self):
+        return {
+            "presented": self.presented_frames,
+            "dropped": self.decode_dropped_frames + self.present_dropped_frames,
+            "late": self.late_frames,
+            "skipped": self.skipped_frames,
+            "render_tier": self.render_tier,
+            "underruns": self.underruns,
+            "queue_depth": self.frame_queue.depth,
+            "queue_high_water_frames": self.frame_queue.high_water_frames,
+            "queue_high_water_bytes": self.frame_queue.high_water_bytes,
+            "pool_allocations": self.frame_pool.allocations,
+            "pool_reuses": self.frame_pool.reuses,
+            # 解码后端转换时自己分配的临时帧（PyAV），不经过缓冲池
+            "decoder_allocations": getattr(self.decoder, "scratch_allocations", 0),
+            "peak_rss": _peak_rss_bytes(),
+            "clip_duration": self.clip_duration,
+            "wall_duration": self.wall_duration,
+        }
+
+    def take_frame(self):
+        """
+        主线程在 frame_available 的槽里调用：取出信箱里的帧放到 current_frame。
+        有新帧时返回 True。
+        """
+        with self._mailbox_lock:
+            frame = self._mailbox
+            self._mailbox = None
+        if frame is None:
+            return False
+        if self._stop_event.is_set():
+            # stop() 之后呈现线程才送来的帧，不再显示
+            frame.release()
+            return False
+        if self.clock.elapsed() - frame.pts > 1.0 / self.fps:
+            self.late_frames += 1
+            frametrace.count("video.late_frames")
+        self._set_current(frame)
+        self.presented_frames += 1
+        return True
+
+    def _post_frame(self, frame):
+        with self._mailbox_lock:
+            previous = self._mailbox
+            self._mailbox = frame
+        if previous is None:
+            self.frame_available.emit()
+        else:
+            # 主线程还没来得及取走上一帧，合并成一次通知
+            previous.release()
+            self.present_dropped_frames += 1
+            frametrace.count("video.dropped_frames")
+
+    def _run_presenter(self):
+        interval = 1.0 / self.fps
+        while not self._stop_event.is_set():
+            if not self._clock_started.wait(interval):
+                continue
+            pts = self.frame_queue.wait_head(interval)
+            if pts is None:
+                if self._decode_done:
+                    break
+                # 播放中一个帧间隔内都没有新帧可用，缓冲见底
+                self.underruns += 1
+                continue
+            delay = self.clock.time_until(pts)
+            if delay > 0:
+                self._stop_event.wait(delay)
+                continue
+            frame, skipped = self.frame_queue.pop_due(self.clock.elapsed())
+            if skipped:
+                self.present_dropped_frames += skipped
+                frametrace.count("video.dropped_frames", skipped)
+            if frame is None:
+                continue
+            # 这一帧的显示时段已经过去了（解码没跟上），不再送给主线程
+            if self.clock.elapsed() - frame.pts > interval:
+                frame.release()
+                self.present_dropped_frames += 1
+                frametrace.count("video.dropped_frames")
+                continue
+            frametrace.instant("video.present", pts=frame.pts)
+            self._post_frame(frame)
+
+    def _set_current(self, frame):
+        # 上一帧已经画完了，缓冲还回池里
+        previous = self._current_buffer
+        self._current_buffer = frame
+        self.current_frame = frame.image if frame else None
+        if previous:
+            previous.release()
 
     def play(self):
-        if not OPENCV_AVAILABLE:
-            print("OpenCV不可用，跳过视频播放")
+        if self._stop_event.is_set():
+            return
+        self._backends = select_backends(self.decode_backend)
+        if not self._backends:
+            print("没有可用的视频解码后端，跳过视频播放")
             QTimer.singleShot(0, self.parent_window.video_finished)
             return
+        self._acquire_owner()
+        self._start_backends()
+
+    def _start_backends(self):
+        """
+        从 self._backends 的第一个开始播放，调用方已经 _acquire_owner()：拉帧的后端开解码线程；
+        推帧的后端回到事件循环以后再在主线程启动，play() 的调用方先把界面摆好，启动失败的通知不会抢在前面。
+        """
+        if not self._backends[0].pull:
+            self._start_pushed.emit(self._backends[0])
+            return
+        self.thread = Thread(target=self._run_video, daemon=True)
+        self.thread.start()
 
-        def run_video():
-            try:
-                self.cap = cv2.VideoCapture(self.video_path)
-                if not self.cap.isOpened():
-                    print("无法打开视频文件:", self.video_path)
-                    QTimer.singleShot(0, self.parent_window.video_finished)
-                    return
-
-                self.video_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                self.video_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = self.cap.get(cv2.CAP_PROP_FPS)
-                try:
-                    self.fps = float(fps) if fps and fps > 0 else 30.0
-                except Exception:
-                    self.fps = 30.0
-
-                self.is_playing = True
-
-                while self.is_playing:
-                    ret, frame = self.cap.read()
-                    if not ret:
-                        break
-
-                    try:
-                        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        h, w, ch = rgb_frame.shape
-                        bytes_per_line = ch * w
-                        qimg = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888).copy()
-                        self.current_frame = qimg
-                        self.frame_ready.set()
-                    except Exception as e:
-                        print("帧转换错误:", e)
-                        pass
-
-                    time.sleep(1.0 / self.fps)
-
-                self.is_playing = False
-                # 改成发信号通知
+    def _start_presenter(self):
+        self.is_playing = True
+        self.present_thread = Thread(target=self._run_presenter, daemon=True)
+        self.present_thread.start()
+
+    def _run_video(self):
+        try:
+            target = self._target_size
+            clip = None
+            if self.frame_cache and target:
+                clip = self.frame_cache.open(self.video_path, target)
+            if clip:
+                self._cached_clip = clip
+                print("使用帧缓存播放:", clip.path)
+                last_pts = self._play_cached(clip)
+            elif self.decode_backend == "process":
+                last_pts = self._play_process(target)
+            else:
+                last_pts = self._play_decoder(target)
+            if last_pts is None or self._stop_event.is_set():
+                return
+
+            # 片子比预缓冲帧数还短时，读完就开始播
+            self._decode_done = True
+            self._prefilled()
+            self.clip_duration = last_pts + 1.0 / self.fps
+
+            # 等呈现线程把缓冲的帧取完，最后一帧也停留完整的一个帧间隔，墙钟时长才能和片长对上
+            self.frame_queue.wait_drained()
+            if self.is_playing:
+                delay = self.clock.time_until(self.clip_duration)
+                if delay > 0:
+                    self._stop_event.wait(delay)
+            if self._stop_event.is_set():
+                return
+            self.wall_duration = self.clock.elapsed()
+
+            self.is_playing = False
+            stats = self.playback_stats()
+            print("视频播放统计: 显示 {presented} 帧, 丢弃 {dropped} 帧, 延迟 {late} 帧, 跳帧 {skipped} 帧, "
+                  "渲染档位 {render_tier}, 缓冲见底 {underruns} 次, "
+                  "队列峰值 {queue_high_water_frames} 帧 / {queue_high_water_bytes} 字节, "
+                  "缓冲分配 {pool_allocations} 次 / 复用 {pool_reuses} 次, 解码器临时分配 {decoder_allocations} 次, 峰值内存 {peak_rss} 字节, "
+                  "实际用时 {wall_duration:.3f}s / 片长 {clip_duration:.3f}s".format(**stats))
+            # 改成发信号通知
+            self.video_finished_signal.emit()
+
+        except Exception as e:
+            print(f"视频播放线程错误: {e}")
+            if not self._stop_event.is_set():
                 self.video_finished_signal.emit()
+        finally:
+            self._shutdown_worker()
 
+    def _shutdown_worker(self):
+        """解码线程退出前调用：让呈现线程退出并等它，再释放解码线程持有的资源，最后发 stopped。"""
+        self.is_playing = False
+        self._decode_done = True
+        # 出错提前退出时队列里可能还有帧，呈现线程取不完；正常播完时队列已经空了
+        self.frame_queue.close()
+        if self.present_thread is not None:
+            # 呈现线程最多等一个帧间隔就会看到队列关了
+            self.present_thread.join()
+        with self._mailbox_lock:
+            pending = self._mailbox
+            self._mailbox = None
+        if pending:
+            pending.release()
+        # 自然播完时主线程还在显示最后一帧（可能引用共享内存），等 video_finished 的处理调用 stop() 放掉它
+        self._released.wait()
+        try:
+            if self.decoder is not None and self.decoder.pull:
+                self.decoder.close()
+            if self._cached_clip:
+                self._cached_clip.close()
+            if self._process_decoder:
+                self._process_decoder.close()
+        except Exception as e:
+            print(f"释放视频解码资源出错: {e}")
+        finally:
+            self._cached_clip = None
+            self._process_decoder = None
+            self.frame_pool.close()
+            self._release_owner()
+
+    def _acquire_owner(self):
+        with self._owners_lock:
+            self._owners += 1
+
+    def _release_owner(self):
+        with self._owners_lock:
+            self._owners -= 1
+            done = self._owners == 0 and not self._finishing
+            if done:
+                self._finishing = True
+        if done:
+            self._finish()
+
+    def _finish(self):
+        self.stopped.emit()
+        # 发完信号再置位：wait() 返回以后解码线程不会再碰这个 QObject，进程可以放心退出
+        self._finished.set()
+
+    def wait(self, timeout=None):
+        """等到 stopped（线程退出、资源释放）为止，超时返回 False。给测试和进程退出前用，主线程里不要无限等。"""
+        return self._finished.wait(timeout)
+
+    def _play_cached(self, clip):
+        """直接从 mmap 的帧缓存播放，返回最后一帧的 pts。"""
+        dpr = self._target_size[2]
+        self.fps = clip.fps
+        self.video_width = clip.width
+        self.video_height = clip.height
+        interval = 1.0 / self.fps
+        self._start_presenter()
+        pts = -interval
+        for index in range(clip.frame_count):
+            if not self.is_playing:
+                break
+            pts = index / self.fps
+
+            def load():
+                with frametrace.span("video.read", pts=pts):
+                    return MappedFrame(clip.frame(index), dpr, pts)
+
+            if not self._admit_frame(index, pts, interval, load):
+                break
+        return pts
+
+    def _admit_frame(self, index, pts, interval, load, writer=None, target=None, discard=None):
+        """
+        三种拉帧的播放循环每读到一帧都调用（index 从 0 开始）：按画质档跳帧、丢掉已经落后的帧，
+        其余的交给帧缓存写入器并放进队列。load() 只对要显示的帧调用，返回这一帧，返回 None 表示读不下去了；
+        跳过、丢掉的帧调用 discard()。返回 False 时调用方结束循环。
+        """
+        # 播放中途目标尺寸变了或者降了画质，缓存也作废
+        if writer and (self._target_size != target or self.render_degraded):
+            writer.abort()
+        if self._skip_for_quality(index):
+            if discard:
+                discard()
+            return True
+
+        # 已经落后一帧以上：不转换直接丢。正在写缓存时每帧都要，落后的帧留给呈现线程去丢
+        caching = writer is not None and writer.active
+        if not caching and self._clock_started.is_set() and self.clock.elapsed() - pts > interval:
+            self.decode_dropped_frames += 1
+            frametrace.count("video.dropped_frames")
+            if discard:
+                discard()
+            return True
+
+        try:
+            frame = load()
+        except Exception as e:
+            print("帧转换错误:", e)
+            if writer:
+                writer.abort()
+            if discard:
+                discard()
+            return True
+        if frame is None:
+            return False
+        if writer:
+            writer.add(frame.array)
+
+        frame.pts = pts
+        with frametrace.span("video.handoff", pts=pts):
+            queued = self.frame_queue.put(frame)
+        if not queued:
+            frame.release()
+            return False
+        if self.frame_queue.depth >= self.prefill_frames:
+            self._prefilled()
+        return True
+
+    def _open_decoder(self):
+        """
+        按 self._backends 的顺序打开拉帧的解码后端，成功时返回它。
+        轮到自己推帧的后端时交给主线程去启动，返回 None；全都打不开时通知播放结束，返回 None。
+        """
+        for backend in self._backends:
+            if self._stop_event.is_set():
+                return None
+            if not backend.pull:
+                # 推帧的后端接手以后由它负责收尾，解码线程先退出也不算停好
+                self._acquire_owner()
+                self._start_pushed.emit(backend)
+                return None
+            if not load_video_modules(backend):
+                continue
+            decoder = backend(self.video_path)
+            try:
+                with frametrace.span("video.open", backend=backend.name):
+                    opened = decoder.open()
             except Exception as e:
-                print(f"视频播放线程错误: {e}")
+                print(f"解码后端 {backend.name} 出错: {e}")
+                opened = False
+            if opened:
+                print("视频解码后端:", backend.name)
+                self.backend_name = backend.name
+                return decoder
+            decoder.close()
+        print("无法打开视频文件:", self.video_path)
+        self.video_finished_signal.emit()
+        return None
+
+    def _play_decoder(self, target):
+        """用拉帧的解码后端实时解码播放，返回最后一帧的 pts；打不开视频时返回 None。"""
+        self.decoder = self._open_decoder()
+        if self.decoder is None:
+            return None
+        self.video_width = self.decoder.width
+        self.video_height = self.decoder.height
+        self.fps = self.decoder.fps
+
+        interval = 1.0 / self.fps
+        writer = None
+        if self.frame_cache and target:
+            dst_w, dst_h, _ = self._fit_size(self.video_width, self.video_height)
+            writer = self.frame_cache.writer(self.video_path, target, self.fps, dst_w, dst_h,
+                                             self.decoder.frame_count)
+        self._start_presenter()
+        index = 0
+        pts = -interval
+
+        try:
+            while self.is_playing:
+                if frametrace.ENABLED:
+                    frame_start = frametrace.now()
+                with frametrace.span("video.read"):
+                    grabbed = self.decoder.grab()
+                if not grabbed:
+                    break
+                pts = self.decoder.pts(index)
+
+                # 跳过、丢掉的帧不做 retrieve 和缩放
+                def load():
+                    with frametrace.span("video.convert", pts=pts):
+                        return self._decode_into_pool()
+
+                admitted = self._admit_frame(index, pts, interval, load, writer, target)
+                index += 1
+                if not admitted:
+                    break
+                if frametrace.ENABLED:
+                    frametrace.complete("video.frame", frame_start, frametrace.now(), args={"pts": pts})
+        finally:
+            if writer:
+                # 只有完整播完才保存
+                if self.is_playing:
+                    writer.commit()
+                else:
+                    writer.abort()
+        return pts
+
+    def _play_process(self, target):
+        """在子进程里解码，帧经共享内存环交给主线程，返回最后一帧的 pts；子进程起不来时改为线程内解码。"""
+        decoder = ProcessDecoder(self.video_path, target, self.frame_pool.max_buffers)
+        # 先挂上去，启动过程中 stop() 也能把子进程停掉
+        self._process_decoder = decoder
+        try:
+            self.fps, self.video_width, self.video_height = decoder.start(cancel=self._stop_event)
+        except Exception as e:
+            decoder.close()
+            self._process_decoder = None
+            if self._stop_event.is_set():
+                return None
+            print(f"解码子进程启动失败，改为线程内解码: {e}")
+            return self._play_decoder(target)
+        if self._stop_event.is_set():
+            return None
+        # 启动期间目标尺寸可能变了
+        if self._target_size != target:
+            decoder.set_target(self._target_size)
+
+        interval = 1.0 / self.fps
+        writer = None
+        if self.frame_cache and target:
+            dst_w, dst_h, _ = self._fit_size(self.video_width, self.video_height)
+            writer = self.frame_cache.writer(self.video_path, target, self.fps, dst_w, dst_h, decoder.frame_count)
+        slots = {}
+        self._start_presenter()
+        index = 0
+        pts = -interval
+
+        try:
+            while self.is_playing:
+                message = decoder.recv(interval)
+                if message is None:
+                    continue
+                if message[0] == "end":
+                    break
+                if message[0] == "error":
+                    print("解码子进程错误:", message[1])
+                    if writer:
+                        writer.abort()
+                    break
+                _, slot, pts, width, height = message
+
+                with frametrace.span("video.read", pts=pts):
+                    frame = slots.get(slot)
+                    if frame is None or frame.array.shape != (height, width, 3):
+                        frame = slots[slot] = SharedFrame(decoder, slot, decoder.frame_array(slot, width, height))
+                    frame._released = False
+                    frame.pts = pts
+                    frame.image.setDevicePixelRatio(self._fit_size(self.video_width, self.video_height)[2])
+
+                # 帧已经在共享内存里了，跳过、丢掉时把槽位还给子进程
+                admitted = self._admit_frame(index, pts, interval, lambda: frame, writer, target, frame.release)
+                index += 1
+                if not admitted:
+                    break
+        finally:
+            # 解码完就让子进程退出（join 在解码线程上等，不占主线程）；
+            # 共享内存里的帧还要播完，等 stop() 时再释放
+            decoder.stop()
+            if writer:
+                if self.is_playing:
+                    writer.commit()
+                else:
+                    writer.abort()
+        return pts
+
+    def _play_pushed(self, backend):
+        """
+        启动自己推帧的解码后端（QtMultimedia），主线程调用，调用方已经 _acquire_owner()。
+        启动失败时换 self._backends 里的下一个后端，都试过了才按播放结束处理。
+        """
+        if self._stop_event.is_set():
+            self._release_owner()
+            return
+        decoder = backend(self.video_path)
+        self.decoder = decoder
+        self._pushed_active = True
+        self.backend_name = backend.name
+        self.is_playing = True
+        try:
+            decoder.start(self._on_pushed_frame, self._on_pushed_finished)
+        except Exception as e:
+            print(f"解码后端 {backend.name} 启动失败: {e}")
+            self.is_playing = False
+            self._pushed_active = False
+            self.decoder = None
+            decoder.close()
+            self._backends = self._backends[self._backends.index(backend) + 1:]
+            if self._backends and not self._stop_event.is_set():
+                # 所有权交给下一个后端
+                self._start_backends()
+                return
+            if not self._stop_event.is_set():
+                print("无法打开视频文件:", self.video_path)
                 self.video_finished_signal.emit()
-            finally:
-                if self.cap:
-                    self.cap.release()
+            self._release_owner()
+            return
+        print("视频解码后端:", backend.name)
 
-        self.thread = Thread(target=run_video, daemon=True)
-        self.thread.start()
+    def _on_pushed_frame(self, image, pts):
+        # 在 Qt 送帧的线程里调用：缩放到目标尺寸再交给主线程，Qt 自己按时间送帧，不用再排队
+        if not self.is_playing:
+            return
+        index = self._pushed_index
+        self._pushed_index += 1
+        if self._skip_for_quality(index):
+            return
+        if pts is None:
+            pts = index / self.fps
+        self.video_width, self.video_height = image.width(), image.height()
+        dst_w, dst_h, dpr = self._fit_size(self.video_width, self.video_height)
+        with frametrace.span("video.convert", pts=pts):
+            if (dst_w, dst_h) != (self.video_width, self.video_height):
+                mode = Qt.FastTransformation if self.fast_scaling else Qt.SmoothTransformation
+                image = image.scaled(dst_w, dst_h, Qt.IgnoreAspectRatio, mode)
+            image.setDevicePixelRatio(dpr)
+        frametrace.instant("video.present", pts=pts)
+        self._post_frame(ImageFrame(image, pts))
+        # 第一帧发 preroll_ready；预卷结束后的第一帧开始走时钟，从这一帧的 pts 算起
+        if not self._clock_started.is_set():
+            self._prefilled(pts)
+
+    def _on_pushed_finished(self, error):
+        if error:
+            print("视频播放错误:", error)
+        self.is_playing = False
+        self.wall_duration = self.clock.elapsed()
+        if not self._stop_event.is_set():
+            self.video_finished_signal.emit()
 
     def stop(self):
+        """
+        请求停止，主线程调用，可以重复调用，不阻塞：唤醒在队列、缓冲池上等待的线程，丢掉信箱里和正在显示的帧。
+        解码线程在一个帧间隔内看到请求后自己收尾，完成时发 stopped。
+        """
         self.is_playing = False
-        if self.cap:
-            try:
-                self.cap.release()
-            except Exception:
-                pass
-        self.frame_ready.clear()
-        self.current_frame = None
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=1)
+        self._stop_event.set()
+        self.frame_queue.close()
+        with self._mailbox_lock:
+            pending = self._mailbox
+            self._mailbox = None
+        if pending:
+            pending.release()
+        # 关掉以后 acquire() 不再阻塞，解码线程拿到 None 就退出循环
+        self.frame_pool.close()
+        self._set_current(None)
+        self._released.set()
+        if self._pushed_active:
+            # 推帧的后端归主线程，在这里关
+            self._pushed_active = False
+            self.decoder.close()
+            self._release_owner()
+        with self._owners_lock:
+            # 还没开始播，或者没有可用的后端：直接算停好了
+            idle = self._owners == 0 and not self._finishing
+            if idle:
+                self._finishing = True
+        if idle:
+            self._finish()
 
 
 class MainWindow(QMainWindow):
     settings_updated = Signal(dict)
 
-    def __init__(self):
+    def __init__(self, settings=None):
         super().__init__()
 
-        self.settings = {
-            "theme_config": "Auto",
-            "download_path": os.path.abspath('./Images'),
-            "today_image_config": True,
-            "trayicon_config": True
-        }
+        self.settings = dict(settings) if settings else default_settings()
+        self.theme = None
+        # 和首次引导共用：引导里改的设置合并以后从这里发过来
+        self.settings_bus = SettingsBus(self.settings, self)
 
         self.setup_ui()
         self.setup_connections()
@@ -135,92 +1104,102 @@ class MainWindow(QMainWindow):
 
     def setup_connections(self):
         self.settings_updated.connect(self.update_window_style)
+        self.settings_bus.changed.connect(self.on_settings_changed)
 
-    def update_window_style(self, settings):
-        theme = settings.get("theme_config", "Auto")
+    def on_settings_changed(self, changes):
+        self.settings.update(changes)
+        if "theme_config" in changes:
+            self.update_window_style(self.settings)
 
-        if theme == "Dark":
-            self.set_dark_theme()
-        elif theme == "Light":
-            self.set_light_theme()
-        else:
-            if self.palette().window().color().lightness() < 128:
-                self.set_dark_theme()
-            else:
-                self.set_light_theme()
+    def update_window_style(self, settings):
+        # Auto 按当前调色板的亮暗选
+        self.apply_theme(resolve_theme(settings.get("theme_config", "Auto"), self.palette()))
 
     def set_dark_theme(self):
-        dark_palette = QPalette()
-        dark_palette.setColor(QPalette.Window, QColor(53, 53, 53))
-        dark_palette.setColor(QPalette.WindowText, Qt.white)
-        dark_palette.setColor(QPalette.Base, QColor(25, 25, 25))
-        dark_palette.setColor(QPalette.AlternateBase, QColor(53, 53, 53))
-        dark_palette.setColor(QPalette.ToolTipBase, Qt.white)
-        dark_palette.setColor(QPalette.ToolTipText, Qt.white)
-        dark_palette.setColor(QPalette.Text, Qt.white)
-        dark_palette.setColor(QPalette.Button, QColor(53, 53, 53))
-        dark_palette.setColor(QPalette.ButtonText, Qt.white)
-        dark_palette.setColor(QPalette.BrightText, Qt.red)
-        dark_palette.setColor(QPalette.Link, QColor(42, 130, 218))
-        dark_palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
-        dark_palette.setColor(QPalette.HighlightedText, Qt.black)
-
-        self.setPalette(dark_palette)
+        self.apply_theme(get_theme("Dark"))
 
     def set_light_theme(self):
-        light_palette = QPalette()
-        light_palette.setColor(QPalette.Window, Qt.white)
-        light_palette.setColor(QPalette.WindowText, Qt.black)
-        light_palette.setColor(QPalette.Base, Qt.white)
-        light_palette.setColor(QPalette.AlternateBase, QColor(240, 240, 240))
-        light_palette.setColor(QPalette.ToolTipBase, Qt.white)
-        light_palette.setColor(QPalette.ToolTipText, Qt.black)
-        light_palette.setColor(QPalette.Text, Qt.black)
-        light_palette.setColor(QPalette.Button, QColor(240, 240, 240))
-        light_palette.setColor(QPalette.ButtonText, Qt.black)
-        light_palette.setColor(QPalette.BrightText, Qt.red)
-        light_palette.setColor(QPalette.Link, QColor(0, 0, 255))
-        light_palette.setColor(QPalette.Highlight, QColor(0, 120, 215))
-        light_palette.setColor(QPalette.HighlightedText, Qt.white)
-
-        self.setPalette(light_palette)
+        self.apply_theme(get_theme("Light"))
+
+    def apply_theme(self, theme):
+        # 主题没变时不碰调色板：setPalette 会传遍整棵子树
+        if theme is self.theme:
+            return
+        self.theme = theme
+        apply_palette(self, theme.palette())
 
 
 class OOBEWindow(QMainWindow):
+    # 只带值真的变了的设置，由 settings_bus 合并后发出
     settings_updated = Signal(dict)
+    revealed = Signal()
 
-    def __init__(self, parent=None):
+    # 预卷最多等这么久，第一帧还没解码出来也先把窗口显示出来
+    PREROLL_TIMEOUT_MS = 400
+    # 退出进程前最多等解码线程收尾这么久（秒）
+    SHUTDOWN_TIMEOUT = 1.0
+
+    def __init__(self, parent=None, settings_store=None):
         super().__init__()
+        # 解码后端和 numpy 在后台导入，和下面的窗口构建并行
+        self.decode_backend = os.environ.get("OOBE_DECODE_BACKEND", "auto")
+        preload_video_modules(self.decode_backend)
         self.parent = parent
+        self.settings_store = settings_store
         self.video_player = None
-        self.video_update_timer = None  # QTimer 用来在主线程检测并刷新帧
         self.drag_pos = QPointF()
+        self._revealed = False
+        self._shown_at = None
+        self.render_governor = None
+        self._frame_taken_at = None
 
-        self.settings = {
-            "theme_config": "Auto",
-            "download_path": os.path.abspath('./Images'),
-            "today_image_config": True,
-            "trayicon_config": True
-        }
+        if settings_store:
+            self.settings = dict(settings_store.settings)
+        else:
+            self.settings = default_settings()
+        # 有主窗口时和它共用一个，主题等修改合并以后两边各自只应用一次
+        self.settings_bus = getattr(parent, "settings_bus", None) or SettingsBus(self.settings, self)
+        self.settings_bus.changed.connect(self.on_settings_changed)
+        self.theme = resolve_theme(self.settings["theme_config"], self.palette())
+        self._welcome_styled = False
 
         self.setup_ui()
         self.setup_animations()
 
-        self.show_window()
+        # 先预卷：解码好第一帧以后才显示窗口、开始滑入动画，避免动画一开始是个空窗口
         self.play_intro_video()
+        if not self._revealed:
+            QTimer.singleShot(self.PREROLL_TIMEOUT_MS, self.reveal_window)
 
     def closeEvent(self, event):
-        # 停掉视频定时器并停止播放线程（如有）
-        if self.video_update_timer and self.video_update_timer.isActive():
-            self.video_update_timer.stop()
+        # 停止播放线程（如有）：只是发请求，线程自己收尾，不卡关窗口
         if self.video_player:
+            self.video_surface.set_frame(None)
             self.video_player.stop()
 
+        self.settings_bus.flush()
+        if self.settings_store:
+            self.settings_store.flush()
+
         if self.parent:
             self.parent.settings = self.settings
             self.parent.update_window_style(self.settings)
         super().closeEvent(event)
 
+    def shutdown_video(self):
+        """
+        进程退出前调用（QApplication.aboutToQuit）：停止播放并限时等解码线程退出。
+        stop() 本身不等线程，解释器退出时线程还在 cv2 里会让进程异常终止。
+        """
+        if not self.video_player:
+            return True
+        self.video_surface.set_frame(None)
+        self.video_player.stop()
+        if not self.video_player.wait(self.SHUTDOWN_TIMEOUT):
+            print("解码线程没有按时退出")
+            return False
+        return True
+
     def setup_ui(self):
         self.setWindowTitle("欢迎使用")
         self.setWindowFlags(
@@ -232,48 +1211,24 @@ class OOBEWindow(QMainWindow):
 
         self.main_widget = QWidget()
         self.main_widget.setObjectName("mainWidget")
-        self.main_widget.setStyleSheet("""
-            #mainWidget {
-                background-color: transparent;
-                border-radius: 12px;
-            }
-        """)
+        self.main_widget.setProperty("introFinished", False)
+        self.main_widget.setProperty("theme", self.theme.name)
+        self.main_widget.setStyleSheet(main_widget_stylesheet())
 
         self.stacked_widget = QStackedWidget()
 
-        # 用于放视频的占位 widget（我们在整个窗体 paintEvent 中绘制视频）
+        # 视频页：透明的容器里放一块不透明的 VideoSurface，视频只在它上面画
         self.video_container = QWidget()
         self.video_container.setStyleSheet("background: transparent;")
+        self.video_surface = VideoSurface(self.video_container)
+        self.video_surface.frame_painted.connect(self._on_video_painted)
 
-        # 欢迎页面（设置界面）
+        # 欢迎页面（设置界面）先只放一个空壳，内容在视频播放时分步搭建（见 _build_welcome_step）
         self.welcome_page = QWidget()
-        welcome_layout = QVBoxLayout()
-        welcome_layout.setContentsMargins(40, 40, 40, 40)
-        welcome_layout.setSpacing(30)
-
-        self.title_label = AnimatedLabel("欢迎使用")
-        self.title_label.setFont(QFont("Arial", 28, QFont.Bold))
-
-        self.desc_label = AnimatedLabel("感谢您选择我们的产品")
-        self.desc_label.setFont(QFont("Arial", 16))
-
-        self.setup_settings_ui()
-
-        self.start_button = QPushButton("进入应用")
-        self.start_button.setFont(QFont("Arial", 14, QFont.Bold))
-        self.start_button.setFixedSize(180, 50)
-        self.start_button.clicked.connect(self.close)
-
-        welcome_layout.addStretch()
-        welcome_layout.addWidget(self.title_label)
-        welcome_layout.addWidget(self.desc_label)
-        welcome_layout.addStretch()
-        welcome_layout.addLayout(self.settings_layout)
-        welcome_layout.addStretch()
-        welcome_layout.addWidget(self.start_button, 0, Qt.AlignCenter)
-        welcome_layout.addStretch()
-
-        self.welcome_page.setLayout(welcome_layout)
+        self.welcome_layout = QVBoxLayout()
+        self.welcome_layout.setContentsMargins(40, 40, 40, 40)
+        self.welcome_layout.setSpacing(30)
+        self.welcome_page.setLayout(self.welcome_layout)
 
         self.stacked_widget.addWidget(self.video_container)  # index 0 -> 视频
         self.stacked_widget.addWidget(self.welcome_page)    # index 1 -> 设置
@@ -285,26 +1240,140 @@ class OOBEWindow(QMainWindow):
         self.main_widget.setLayout(main_layout)
         self.setCentralWidget(self.main_widget)
 
+        self._welcome_steps = deque([
+            self._build_welcome_header,
+            self.setup_settings_ui,
+            self._load_welcome_icon,
+            self._build_welcome_footer,
+            self._style_welcome_page,
+            self._warm_welcome_page,
+            self._prewarm_welcome_text,
+            self._prerender_welcome_page,
+        ])
+        # 每显示一帧视频只做一步，放在这一帧画完之后的空闲时间里，不挡住下一帧
+        self._welcome_timer = QTimer(self)
+        self._welcome_timer.setSingleShot(True)
+        self._welcome_timer.setInterval(0)
+        self._welcome_timer.timeout.connect(self._build_welcome_step)
+
+    def schedule_welcome_step(self):
+        """安排在事件循环下次空闲时搭建欢迎页的下一步，已经安排过或已经搭完时什么都不做。"""
+        if self._welcome_steps and not self._welcome_timer.isActive():
+            self._welcome_timer.start()
+
+    def _build_welcome_step(self):
+        if not self._welcome_steps:
+            return
+        step = self._welcome_steps.popleft()
+        with frametrace.span("welcome.build", cat="ui", step=step.__name__):
+            step()
+
+    def ensure_welcome_page(self):
+        """把还没做完的搭建步骤一次做完（视频提前结束或者没有视频时）。"""
+        self._welcome_timer.stop()
+        while self._welcome_steps:
+            self._build_welcome_step()
+
+    def _build_welcome_header(self):
+        fonts = default_font_resolver()
+        self.title_label = AnimatedLabel("欢迎使用")
+        self.title_label.setFont(fonts.font("body", 28, QFont.Bold))
+
+        self.desc_label = AnimatedLabel("感谢您选择我们的产品")
+        self.desc_label.setFont(fonts.font("body", 16))
+
+        self.welcome_layout.addStretch()
+        self.welcome_layout.addWidget(self.title_label)
+        self.welcome_layout.addWidget(self.desc_label)
+        self.welcome_layout.addStretch()
+
+    def _build_welcome_footer(self):
+        fonts = default_font_resolver()
+        self.start_button = QPushButton("进入应用")
+        self.start_button.setFont(fonts.font("body", 14, QFont.Bold))
+        self.start_button.setFixedSize(180, 50)
+        self.start_button.clicked.connect(self.finish_onboarding)
+
+        self.welcome_layout.addWidget(self.start_button, 0, Qt.AlignCenter)
+        self.welcome_layout.addStretch()
+
+    def _style_welcome_page(self):
+        # 样式表是主题缓存好的字符串，和控件现有的一样时不重新设置
+        apply_stylesheet(self.title_label, self.theme.stylesheet("title"))
+        apply_stylesheet(self.desc_label, self.theme.stylesheet("desc"))
+        apply_stylesheet(self.start_button, self.theme.stylesheet("startButton"))
+        self._welcome_styled = True
+
+    def apply_theme(self, theme):
+        """
+        换主题：mainWidget 的样式表里已经有所有主题的规则，只切 theme 属性、重新套用它自己的样式；
+        欢迎页搭好以后再换掉标题等几个叶子控件的样式表。
+        """
+        if theme is self.theme:
+            return
+        self.theme = theme
+        with frametrace.span("theme.apply", cat="ui", theme=theme.name):
+            self.main_widget.setProperty("theme", theme.name)
+            self._repolish_main_widget()
+            if self._welcome_styled:
+                self._style_welcome_page()
+
+    def _warm_welcome_page(self):
+        # 提前套用样式表、加载字体、算好布局，切页时只剩一次绘制
+        for widget in [self.welcome_page] + self.welcome_page.findChildren(QWidget):
+            widget.ensurePolished()
+            widget.fontMetrics().height()
+        self.welcome_page.resize(self.stacked_widget.size())
+        self.welcome_layout.activate()
+        # 第一次 unpolish 要初始化样式表缓存，很慢（十几毫秒），不能留到切页时
+        self._repolish_main_widget()
+
+    def _prewarm_welcome_text(self):
+        # 欢迎页和设置里的固定文字按控件最终的字体（样式表套用之后）各画一遍，
+        # 下拉框弹出来才画的选项也在里面，字形光栅化不留到切页或者第一次展开下拉框
+        texts = {}
+        for widget in self.welcome_page.findChildren(QWidget):
+            if isinstance(widget, QComboBox):
+                strings = [widget.itemText(index) for index in range(widget.count())]
+            elif isinstance(widget, (QLabel, QPushButton, QCheckBox)):
+                strings = [widget.text()]
+            else:
+                continue
+            font = widget.font()
+            texts.setdefault(font.key(), (font, []))[1].extend(text for text in strings if text)
+        for font, strings in texts.values():
+            if strings:
+                FontResolver.prewarm(font, strings)
+
+    def _prerender_welcome_page(self):
+        # 离屏画一遍，字形缓存和控件样式的位图都先生成好
+        self.welcome_page.grab()
+
+    def _repolish_main_widget(self):
+        # 只重新套用 mainWidget 自己的样式，子控件的样式在搭建时已经套好
+        style = self.main_widget.style()
+        style.unpolish(self.main_widget)
+        style.polish(self.main_widget)
+        self.main_widget.update()
+
     def setup_settings_ui(self):
+        fonts = default_font_resolver()
         self.settings_layout = QVBoxLayout()
         self.settings_layout.setSpacing(20)
 
         top_layout = QHBoxLayout()
-        icon_label = QLabel()
-        icon_label.setFixedSize(64, 64)
-        if os.path.exists("114514.png"):
-            pixmap = QPixmap("114514.png").scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            icon_label.setPixmap(pixmap)
-        top_layout.addWidget(icon_label, 0, Qt.AlignLeft | Qt.AlignTop)
+        self.icon_label = QLabel()
+        self.icon_label.setFixedSize(64, 64)
+        top_layout.addWidget(self.icon_label, 0, Qt.AlignLeft | Qt.AlignTop)
 
         right_layout = QVBoxLayout()
 
         theme_layout = QHBoxLayout()
         theme_label = QLabel("应用主题:")
-        theme_label.setFont(QFont("Arial", 12))
+        theme_label.setFont(fonts.font("body", 12))
         theme_label.setFixedWidth(180)
         self.theme_combo = QComboBox()
-        self.theme_combo.setFont(QFont("Arial", 12))
+        self.theme_combo.setFont(fonts.font("body", 12))
         self.theme_combo.addItems(["Auto", "Light", "Dark"])
         self.theme_combo.setCurrentText(self.settings["theme_config"])
         self.theme_combo.currentTextChanged.connect(self.on_theme_changed)
@@ -313,13 +1382,13 @@ class OOBEWindow(QMainWindow):
 
         download_layout = QHBoxLayout()
         download_label = QLabel("图片保存目录:")
-        download_label.setFont(QFont("Arial", 12))
+        download_label.setFont(fonts.font("body", 12))
         download_label.setFixedWidth(180)
         self.download_path_edit = QLineEdit(self.settings["download_path"])
-        self.download_path_edit.setFont(QFont("Arial", 12))
+        self.download_path_edit.setFont(fonts.font("body", 12))
         self.download_path_edit.setReadOnly(True)
         browse_button = QPushButton("浏览...")
-        browse_button.setFont(QFont("Arial", 12))
+        browse_button.setFont(fonts.font("body", 12))
         browse_button.setFixedSize(100, 30)
         browse_button.clicked.connect(self.browse_download_path)
         download_layout.addWidget(download_label)
@@ -327,17 +1396,17 @@ class OOBEWindow(QMainWindow):
         download_layout.addWidget(browse_button)
 
         today_image_check = QCheckBox("启用每日一图")
-        today_image_check.setFont(QFont("Arial", 12))
+        today_image_check.setFont(fonts.font("body", 12))
         today_image_check.setChecked(self.settings["today_image_config"])
-        today_image_check.stateChanged.connect(
-            lambda state: self.on_setting_changed("today_image_config", state == Qt.Checked)
+        today_image_check.toggled.connect(
+            lambda checked: self.on_setting_changed("today_image_config", checked)
         )
 
         trayicon_check = QCheckBox("关闭最小化到托盘(不关闭壁纸生成器)")
-        trayicon_check.setFont(QFont("Arial", 12))
+        trayicon_check.setFont(fonts.font("body", 12))
         trayicon_check.setChecked(self.settings["trayicon_config"])
-        trayicon_check.stateChanged.connect(
-            lambda state: self.on_setting_changed("trayicon_config", state == Qt.Checked)
+        trayicon_check.toggled.connect(
+            lambda checked: self.on_setting_changed("trayicon_config", checked)
         )
 
         right_layout.addLayout(theme_layout)
@@ -348,12 +1417,38 @@ class OOBEWindow(QMainWindow):
         top_layout.addLayout(right_layout)
         self.settings_layout.addLayout(top_layout)
 
+        self.welcome_layout.addLayout(self.settings_layout)
+        self.welcome_layout.addStretch()
+
+    def _load_welcome_icon(self):
+        # 磁盘上有预缩放好的变体时直接读，没有时和开屏的大图共用一次解码
+        pixmap = default_resolver().thumbnail("114514.png", (64, 64), self.icon_label.devicePixelRatioF())
+        if not pixmap.isNull():
+            self.icon_label.setPixmap(pixmap)
+
     def on_theme_changed(self, theme):
-        self.settings["theme_config"] = theme
-        self.settings_updated.emit(self.settings)
+        self.on_setting_changed("theme_config", theme)
 
     def on_setting_changed(self, key, value):
         self.settings[key] = value
+        self.save_settings()
+        self.settings_bus.set(key, value)
+
+    def on_settings_changed(self, changes):
+        if "theme_config" in changes:
+            self.apply_theme(resolve_theme(changes["theme_config"], self.palette()))
+        self.settings_updated.emit(changes)
+
+    def save_settings(self):
+        # 延迟合并保存，连续改多项只写一次盘
+        if self.settings_store:
+            self.settings_store.update(self.settings)
+
+    def finish_onboarding(self):
+        if self.settings_store:
+            self.settings_store.update(self.settings)
+            self.settings_store.complete_onboarding()
+        self.close()
 
     def browse_download_path(self):
         path = QFileDialog.getExistingDirectory(
@@ -362,8 +1457,8 @@ class OOBEWindow(QMainWindow):
             self.settings["download_path"]
         )
         if path:
-            self.settings["download_path"] = path
             self.download_path_edit.setText(path)
+            self.on_setting_changed("download_path", path)
 
     def setup_animations(self):
         self.opacity_animation = QPropertyAnimation(self, b"windowOpacity")
@@ -380,35 +1475,64 @@ class OOBEWindow(QMainWindow):
         self.animation_group.addAnimation(self.pos_animation)
 
     def play_intro_video(self):
-        video_path = "114514.mp4"
-        if not OPENCV_AVAILABLE:
-            print("OpenCV 不可用，跳过视频并显示欢迎页")
+        video_path = default_resolver().path("114514.mp4")
+        if not VIDEO_BACKENDS:
+            print("没有可用的视频解码后端，跳过视频并显示欢迎页")
             self.video_finished()
             return
 
-        if not os.path.exists(video_path):
-            print(f"视频文件 {video_path} 不存在，直接进入欢迎页")
+        if not video_path:
+            print("视频文件 114514.mp4 不存在，直接进入欢迎页")
             self.video_finished()
             return
 
-        self.video_player = VideoPlayer(video_path, self)
+        # 帧缓存默认不开：存的是未压缩的 RGB，高缩放比下几百 MB，而首次引导通常只走一次，
+        # 写了也很少再读；反复演示开场视频时用 OOBE_FRAME_CACHE=1 打开
+        frame_cache = None
+        if os.environ.get("OOBE_FRAME_CACHE", "0") == "1":
+            frame_cache = FrameCache()
+        self.video_player = VideoPlayer(video_path, self, frame_cache=frame_cache, preroll=True,
+                                        decode_backend=self.decode_backend)
+        if os.environ.get("OOBE_RENDER_GOVERNOR", "1") != "0":
+            self.render_governor = RenderGovernor()
+        self._update_video_target_size()
         self.video_player.video_finished_signal.connect(self.video_finished)
-        self.video_player.play()
-
-        if self.video_update_timer is None:
-            self.video_update_timer = QTimer(self)
-            self.video_update_timer.timeout.connect(self._on_check_frame)
-        self.video_update_timer.start(30)
-
+        self.video_player.frame_available.connect(self._on_frame_available, Qt.QueuedConnection)
+        self.video_player.preroll_ready.connect(self.reveal_window, Qt.QueuedConnection)
+        # 先切到视频页再 play()：播放结束（包括后端都打不开）时 video_finished 切到欢迎页，不会被这里切回来
         self.stacked_widget.setCurrentWidget(self.video_container)
+        self.video_player.play()
 
-    def _on_check_frame(self):
+    def _on_frame_available(self):
         if not self.video_player:
             return
 
-        if self.video_player.frame_ready.is_set():
-            self.update()
-            self.video_player.frame_ready.clear()
+        if self.video_player.take_frame():
+            # 上一帧还没画出来又来了新帧时，从先到的那一帧开始算
+            if self._frame_taken_at is None:
+                self._frame_taken_at = time.perf_counter()
+            # 第一帧出来以后才开始搭欢迎页，不和第一帧抢时间
+            self.schedule_welcome_step()
+            self.video_surface.set_frame(self.video_player.current_frame)
+
+    def _on_video_painted(self):
+        if self._shown_at is not None:
+            # 窗口显示出来到第一帧画出来之间是空窗口
+            frametrace.complete("window.empty", self._shown_at, frametrace.now(), cat="ui")
+            self._shown_at = None
+        self._record_present()
+
+    def reveal_window(self):
+        """预卷完成、超时或者没有视频时显示窗口，只执行一次。"""
+        if self._revealed:
+            return
+        self._revealed = True
+        if self.video_player:
+            # 第一帧先排进事件队列，窗口第一次绘制时就能画出来
+            self.video_player.release_preroll()
+        self._shown_at = frametrace.now()
+        self.show_window()
+        self.revealed.emit()
 
     def show_window(self):
         screen_geometry = QApplication.primaryScreen().geometry()
@@ -424,45 +1548,26 @@ class OOBEWindow(QMainWindow):
         self.show()
         self.raise_()
         self.activateWindow()
+        # 换到不同缩放比例的屏幕时，解码线程要按新的物理像素尺寸输出
+        if self.windowHandle():
+            self.windowHandle().screenChanged.connect(self._update_video_target_size)
         self.animation_group.start()
 
     def video_finished(self):
         print("视频播放结束，切换界面")
-        if self.video_update_timer and self.video_update_timer.isActive():
-            self.video_update_timer.stop()
+        # 先放掉当前帧的引用，stop() 会把帧缓冲还回去
+        self.video_surface.set_frame(None)
         if self.video_player:
             self.video_player.stop()
+        # 视频打不开或者提前出错时，不用等预卷超时
+        self.reveal_window()
 
-        palette = self.palette()
-        bg_color = palette.window().color()
-        text_color = palette.windowText().color()
-
-        self.main_widget.setStyleSheet(f"""
-            #mainWidget {{
-                background-color: rgba({bg_color.red()}, {bg_color.green()}, {bg_color.blue()}, 0.95);
-                border-radius: 12px;
-                border: 1px solid rgba({text_color.red()}, {text_color.green()}, {text_color.blue()}, 0.1);
-            }}
-        """)
-
-        self.title_label.setStyleSheet(f"color: {text_color.name()}; padding: 5px;")
-        self.desc_label.setStyleSheet(f"color: rgba({text_color.red()}, {text_color.green()}, {text_color.blue()}, 0.8); padding: 5px;")
-
-        self.start_button.setStyleSheet("""
-            QPushButton {
-                background-color: #B498E6;
-                color: white;
-                border: none;
-                padding: 12px 24px;
-                border-radius: 6px;
-                min-width: 120px;
-                font-size: 14px;
-            }
-            QPushButton:hover { background-color: #A288D6; }
-            QPushButton:pressed { background-color: #8F78C2; }
-        """)
-
-        self.stacked_widget.setCurrentWidget(self.welcome_page)
+        with frametrace.span("welcome.switch", cat="ui"):
+            self.ensure_welcome_page()
+            self.main_widget.setProperty("introFinished", True)
+            self._repolish_main_widget()
+
+            self.stacked_widget.setCurrentWidget(self.welcome_page)
         self.title_label.fade_in(800)
         QTimer.singleShot(300, lambda: self.desc_label.fade_in(800))
 
@@ -478,37 +1583,120 @@ class OOBEWindow(QMainWindow):
             self.drag_pos = event.globalPosition()
             event.accept()
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_video_target_size()
 
-        if self.video_player and self.video_player.current_frame and not self.video_player.current_frame.isNull():
-            try:
-                frame = self.video_player.current_frame
-                video_w = frame.width()
-                video_h = frame.height()
-                if video_h == 0:
-                    video_h = 1
-                video_ratio = video_w / video_h
-                window_ratio = self.width() / max(1, self.height())
-
-                if window_ratio > video_ratio:
-                    draw_height = self.height()
-                    draw_width = int(draw_height * video_ratio)
-                    x = (self.width() - draw_width) // 2
-                    y = 0
-                else:
-                    draw_width = self.width()
-                    draw_height = int(draw_width / video_ratio)
-                    x = 0
-                    y = (self.height() - draw_height) // 2
+    def _record_present(self):
+        """把这一帧从取到到画完的时间交给 RenderGovernor，档位变了就应用到解码端。"""
+        taken_at, self._frame_taken_at = self._frame_taken_at, None
+        governor = self.render_governor
+        if governor is None or taken_at is None:
+            return
+        if governor.record(time.perf_counter() - taken_at, 1.0 / self.video_player.fps):
+            self.video_surface.fast_transform = governor.fast_transform
+            self.video_player.set_render_quality(governor.tier_name, governor.fast_transform,
+                                                 governor.decode_scale, governor.frame_step)
 
-                scaled_frame = frame.scaled(draw_width, draw_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                painter.drawImage(x, y, scaled_frame)
-            except Exception as e:
-                print("绘制视频帧异常:", e)
+    def _update_video_target_size(self, *args):
+        # 视频页铺满整个窗口（边距为 0）；预卷时窗口还没显示、容器还没布局，所以直接按窗口尺寸算
+        if self.video_player:
+            self.video_player.set_target_size(self.width(), self.height(), self.devicePixelRatioF())
 
-        super().paintEvent(event)
+
+class VideoSurface(QWidget):
+    """
+    开场视频的绘制面，放在 video_container 里，按帧的宽高比居中，上下（或左右）留出的边仍是透明的容器。
+    不透明绘制（WA_OpaquePaintEvent / WA_NoSystemBackground），每帧只重绘自己这一块：
+    Qt 不用先把半透明的顶层窗口和下面的 main_widget / stacked_widget 画一遍再做 alpha 合成。
+    只有贴着窗口角的地方按窗口圆角清成透明，保持窗口的圆角外形。
+    """
+    frame_painted = Signal()
+
+    def __init__(self, parent, corner_radius=12):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        self.corner_radius = corner_radius
+        self.fast_transform = False
+        self._frame = None
+        self._aspect = None
+        self._corner_key = None
+        self._corner_path = None
+        parent.installEventFilter(self)
+        # 第一帧出来之前不占位置
+        self.hide()
+
+    def set_frame(self, image):
+        """换成新的一帧并只重绘自己；image 为 None 时隐藏（帧缓冲已经还回去了，不能再画）。"""
+        self._frame = image
+        if image is None:
+            self.hide()
+            return
+        size = image.deviceIndependentSize()
+        aspect = size.width() / max(1.0, size.height())
+        if aspect != self._aspect:
+            self._aspect = aspect
+            self._fit_to_parent()
+        if self.isHidden():
+            self.show()
+        self.update()
+
+    def eventFilter(self, obj, event):
+        if obj is self.parentWidget() and event.type() == QEvent.Resize:
+            self._fit_to_parent()
+        return False
+
+    def _fit_to_parent(self):
+        if self._aspect is None:
+            return
+        width, height = self.parentWidget().width(), self.parentWidget().height()
+        if width / max(1, height) > self._aspect:
+            draw_width, draw_height = int(height * self._aspect), height
+        else:
+            draw_width, draw_height = width, int(width / self._aspect)
+        self.setGeometry((width - draw_width) // 2, (height - draw_height) // 2, draw_width, draw_height)
+
+    def _window_corners(self):
+        """贴着窗口角的那几个角要清掉的区域，没有贴着窗口角时返回 None。按位置缓存。"""
+        window = self.window()
+        origin = self.mapTo(window, QPoint(0, 0))
+        key = (origin.x(), origin.y(), self.width(), self.height(), window.width(), window.height())
+        if key == self._corner_key:
+            return self._corner_path
+        self._corner_key = key
+        radius = self.corner_radius
+        left, top = origin.x() <= 0, origin.y() <= 0
+        right, bottom = origin.x() + self.width() >= window.width(), origin.y() + self.height() >= window.height()
+        squares = QPainterPath()
+        for touches, x, y in ((left and top, 0, 0), (right and top, self.width() - radius, 0),
+                              (left and bottom, 0, self.height() - radius),
+                              (right and bottom, self.width() - radius, self.height() - radius)):
+            if touches:
+                squares.addRect(QRectF(x, y, radius, radius))
+        if squares.isEmpty():
+            self._corner_path = None
+        else:
+            rounded = QPainterPath()
+            rounded.addRoundedRect(QRectF(self.rect()), radius, radius)
+            self._corner_path = squares.subtracted(rounded)
+        return self._corner_path
+
+    def paintEvent(self, event):
+        if self._frame is None or self._frame.isNull():
+            return
+        painter = QPainter(self)
+        # 降低解码分辨率以后要放大绘制，降级时放大也用快速变换
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, not self.fast_transform)
+        with frametrace.span("paint.draw", cat="paint"):
+            painter.drawImage(self.rect(), self._frame)
+            corners = self._window_corners()
+            if corners is not None:
+                painter.setRenderHint(QPainter.Antialiasing)
+                painter.setCompositionMode(QPainter.CompositionMode_Clear)
+                painter.fillPath(corners, Qt.transparent)
+        painter.end()
+        self.frame_painted.emit()
 
 
 class AnimatedLabel(QLabel):
@@ -526,11 +1714,29 @@ class AnimatedLabel(QLabel):
         self.anim.start()
 
 
+def init_entry(argv):
+    """入口（这里的 main() 和 launcher.main()）最先调用，返回去掉帧追踪参数的 argv。"""
+    if getattr(sys, "frozen", False):
+        # 打包成 exe 以后，子进程解码器（OOBE_DECODE_BACKEND=process）要靠它启动
+        import multiprocessing
+        multiprocessing.freeze_support()
+    return frametrace.init_from_argv(argv)
+
+
 def main():
-    app = QApplication(sys.argv)
-    main_win = MainWindow()
-    oobe = OOBEWindow(main_win)
-    oobe.show()
+    argv = init_entry(sys.argv)
+    # 先读设置再建窗口：已经完成过引导就直接进主窗口，不再付 OOBE 的开销
+    settings_store = SettingsStore()
+    settings_store.load()
+    app = QApplication(argv)
+    main_win = MainWindow(settings_store.settings)
+    if settings_store.onboarding_completed:
+        main_win.update_window_style(main_win.settings)
+        main_win.show()
+    else:
+        # 不在这里 show()：窗口由 reveal_window() 在预卷完成（或超时）后滑入显示
+        oobe = OOBEWindow(main_win, settings_store)
+        app.aboutToQuit.connect(oobe.shutdown_video)
     sys.exit(app.exec())
 
 
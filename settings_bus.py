@@ -0,0 +1,48 @@
+"""
+设置修改的汇总点：主窗口和首次引导共用一个 SettingsBus，改设置都走 set() / update()，订阅 changed 信号应用修改。
+
+    bus = SettingsBus(settings)
+    bus.changed.connect(lambda changes: ...)   # changes 只包含值真的变了的键
+    bus.set("theme_config", "Dark")
+
+修改先记下来，回到事件循环时合并成一次 changed：连续改同一个键以最后一次为准，改回原值的不发，
+一串修改（比如下拉框滚动时连发的 currentTextChanged）只让订阅方重新套一次主题。
+需要马上生效时（比如关窗口前）调用 flush()。只能在 GUI 线程使用。
+"""
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from settings_store import default_settings
+
+_MISSING = object()
+
+
+class SettingsBus(QObject):
+    """settings 是已经发出去的设置，还没 flush 的修改不在里面。"""
+    changed = Signal(dict)
+
+    def __init__(self, settings=None, parent=None):
+        super().__init__(parent)
+        self.settings = dict(settings) if settings else default_settings()
+        self._pending = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        self._pending.update(values)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """立即发出合并好的修改，返回真的变了的键和值。"""
+        self._timer.stop()
+        pending, self._pending = self._pending, {}
+        changes = {key: value for key, value in pending.items() if self.settings.get(key, _MISSING) != value}
+        if changes:
+            self.settings.update(changes)
+            self.changed.emit(changes)
+        return changes
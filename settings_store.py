@@ -0,0 +1,132 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+
+# 设置文件格式版本，字段有不兼容的变化时加一并在 _migrate 里处理旧版本
+SCHEMA_VERSION = 1
+SETTINGS_FILE = "settings.json"
+
+
+def default_settings():
+    return {
+        "theme_config": "Auto",
+        "download_path": os.path.abspath('./Images'),
+        "today_image_config": True,
+        "trayicon_config": True
+    }
+
+
+def default_config_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "WallpaperGeneratorOOBE")
+
+
+class SettingsStore:
+    """
+    持久化的设置：启动时 load() 一次（小 JSON，不依赖 Qt），修改通过 update() 合并后延迟 debounce 秒保存，
+    连续修改只写一次；写入先写临时文件再 os.replace，不会留下写了一半的文件。
+    onboarding_completed 为 True 表示首次引导已经完成，下次启动可以直接进主窗口。
+    """
+
+    def __init__(self, path=None, debounce=0.5):
+        self.path = path or os.path.join(default_config_dir(), SETTINGS_FILE)
+        self.debounce = debounce
+        self.settings = default_settings()
+        self.onboarding_completed = False
+        self._lock = threading.Lock()
+        # 从取快照到写完文件一直持有：防抖定时器的保存和主线程的强制保存不会交错，旧快照不会后写覆盖新的
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self.settings
+        except (OSError, ValueError) as e:
+            print(f"读取设置失败，使用默认设置: {e}")
+            return self.settings
+
+        data = self._migrate(data)
+        if data is None:
+            return self.settings
+        stored = data.get("settings", {})
+        defaults = default_settings()
+        for key, value in stored.items():
+            # 只接受已知字段且类型一致的值
+            if key in defaults and isinstance(value, type(defaults[key])):
+                self.settings[key] = value
+        self.onboarding_completed = bool(data.get("onboarding_completed", False))
+        return self.settings
+
+    def _migrate(self, data):
+        if not isinstance(data, dict):
+            print("设置文件格式不对，使用默认设置")
+            return None
+        version = data.get("schema_version")
+        if version == SCHEMA_VERSION:
+            return data
+        print(f"不认识的设置文件版本 {version}，使用默认设置")
+        return None
+
+    def update(self, settings=None, **values):
+        with self._lock:
+            if settings:
+                self.settings.update(settings)
+            self.settings.update(values)
+        self.schedule_save()
+
+    def complete_onboarding(self):
+        with self._lock:
+            self.onboarding_completed = True
+        self.flush(force=True)
+
+    def schedule_save(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self, force=False):
+        """立即把未保存的修改写盘。"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer:
+                    self._timer.cancel()
+                    self._timer = None
+                if not (self._dirty or force):
+                    return
+                self._dirty = False
+                data = {
+                    "schema_version": SCHEMA_VERSION,
+                    "onboarding_completed": self.onboarding_completed,
+                    "settings": dict(self.settings),
+                }
+            self._write(data)
+
+    def _write(self, data):
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f"保存设置失败: {e}")
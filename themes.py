@@ -0,0 +1,178 @@
+"""
+主题：每个主题的 QPalette 和样式表只生成一次，之后切换主题只是把缓存好的对象设上去。
+
+    theme = resolve_theme(settings["theme_config"], window.palette())   # "Auto" 按当前调色板的亮暗选
+    apply_palette(window, theme.palette())
+    apply_stylesheet(label, theme.stylesheet("title"))
+
+Theme 建好以后不再改变，同一个名字在进程里只有一个实例，比较主题直接用 is。
+apply_palette() / apply_stylesheet() 在值和控件上现有的一样时什么都不做：
+setPalette 会把调色板传给整棵子树，setStyleSheet 即使内容没变也会重新解析、重新套用子树的样式。
+首次引导的 mainWidget 把所有主题的规则写进同一张样式表（按 theme 属性区分），
+切换主题时只改属性、重新套用它自己的样式，不用重新解析。
+"""
+import threading
+
+THEME_NAMES = ("Auto", "Light", "Dark")
+
+# 主题 -> 调色板角色 -> 颜色（RGB 或者 Qt 的全局颜色名）
+PALETTE_COLORS = {
+    "Dark": {
+        "Window": (53, 53, 53),
+        "WindowText": "white",
+        "Base": (25, 25, 25),
+        "AlternateBase": (53, 53, 53),
+        "ToolTipBase": "white",
+        "ToolTipText": "white",
+        "Text": "white",
+        "Button": (53, 53, 53),
+        "ButtonText": "white",
+        "BrightText": "red",
+        "Link": (42, 130, 218),
+        "Highlight": (42, 130, 218),
+        "HighlightedText": "black",
+    },
+    "Light": {
+        "Window": "white",
+        "WindowText": "black",
+        "Base": "white",
+        "AlternateBase": (240, 240, 240),
+        "ToolTipBase": "white",
+        "ToolTipText": "black",
+        "Text": "black",
+        "Button": (240, 240, 240),
+        "ButtonText": "black",
+        "BrightText": "red",
+        "Link": (0, 0, 255),
+        "Highlight": (0, 120, 215),
+        "HighlightedText": "white",
+    },
+}
+
+_NAMED_COLORS = {"white": (255, 255, 255), "black": (0, 0, 0), "red": (255, 0, 0)}
+
+# 首次引导各控件的样式表模板，{bg} / {text} 是主题窗口背景色、文字颜色的 "r, g, b"
+STYLESHEETS = {
+    "title": "color: rgb({text}); padding: 5px;",
+    "desc": "color: rgba({text}, 0.8); padding: 5px;",
+    "startButton": """
+        QPushButton {{
+            background-color: #B498E6;
+            color: white;
+            border: none;
+            padding: 12px 24px;
+            border-radius: 6px;
+            min-width: 120px;
+            font-size: 14px;
+        }}
+        QPushButton:hover {{ background-color: #A288D6; }}
+        QPushButton:pressed {{ background-color: #8F78C2; }}
+    """,
+}
+
+# mainWidget 视频阶段透明，欢迎页阶段按主题铺背景；每个主题一条规则，按 theme 属性选
+MAIN_WIDGET_BASE = """
+    #mainWidget {
+        background-color: transparent;
+        border-radius: 12px;
+    }
+"""
+MAIN_WIDGET_RULE = """
+    #mainWidget[introFinished="true"][theme="{name}"] {{
+        background-color: rgba({bg}, 0.95);
+        border: 1px solid rgba({text}, 0.1);
+    }}
+"""
+
+
+def _rgb(value):
+    return _NAMED_COLORS[value] if isinstance(value, str) else value
+
+
+class Theme:
+    """一个主题的调色板和样式表，第一次用到时生成，之后一直复用。调色板只在 GUI 线程取。"""
+
+    __slots__ = ("name", "colors", "_palette", "_stylesheets")
+
+    def __init__(self, name):
+        self.name = name
+        self.colors = {role: _rgb(value) for role, value in PALETTE_COLORS[name].items()}
+        self._palette = None
+        self._stylesheets = {}
+
+    def __repr__(self):
+        return f"Theme({self.name!r})"
+
+    def _format_args(self):
+        return {"name": self.name,
+                "bg": "{}, {}, {}".format(*self.colors["Window"]),
+                "text": "{}, {}, {}".format(*self.colors["WindowText"])}
+
+    def palette(self):
+        """这个主题的 QPalette。调用方不要修改它，要改先复制一份。"""
+        if self._palette is None:
+            from PySide6.QtGui import QColor, QPalette
+
+            palette = QPalette()
+            for role, rgb in self.colors.items():
+                palette.setColor(getattr(QPalette, role), QColor(*rgb))
+            self._palette = palette
+        return self._palette
+
+    def stylesheet(self, role):
+        sheet = self._stylesheets.get(role)
+        if sheet is None:
+            sheet = STYLESHEETS[role].format(**self._format_args())
+            self._stylesheets[role] = sheet
+        return sheet
+
+
+_themes = {}
+_themes_lock = threading.Lock()
+_main_widget_stylesheet = None
+
+
+def get_theme(name):
+    """名字对应的 Theme（"Light" / "Dark"），进程里只建一次。"""
+    with _themes_lock:
+        theme = _themes.get(name)
+        if theme is None:
+            theme = _themes[name] = Theme(name)
+        return theme
+
+
+def resolve_theme(name, palette=None):
+    """设置里的主题名换成 Theme："Auto" 或者不认识的名字按 palette 的窗口颜色亮暗选，没给 palette 时用浅色。"""
+    if name not in PALETTE_COLORS:
+        dark = palette is not None and palette.window().color().lightness() < 128
+        name = "Dark" if dark else "Light"
+    return get_theme(name)
+
+
+def main_widget_stylesheet():
+    """首次引导 mainWidget 的样式表，包含所有主题的规则，只生成一次。"""
+    global _main_widget_stylesheet
+    if _main_widget_stylesheet is None:
+        rules = [MAIN_WIDGET_RULE.format(**get_theme(name)._format_args()) for name in PALETTE_COLORS]
+        _main_widget_stylesheet = MAIN_WIDGET_BASE + "".join(rules)
+    return _main_widget_stylesheet
+
+
+def apply_palette(widget, palette):
+    """调色板和控件现有的不同时才设置，返回是否设置了。"""
+    from PySide6.QtCore import Qt
+
+    # 没有显式设置过时，颜色相同也可能只是从父控件继承来的，还是要设
+    if widget.testAttribute(Qt.WA_SetPalette) and widget.palette() == palette:
+        return False
+    widget.setPalette(palette)
+    return True
+
+
+def apply_stylesheet(widget, sheet):
+    """样式表和控件现有的不同时才设置，返回是否设置了。"""
+    if widget.styleSheet() == sheet:
+        return False
+    widget.setStyleSheet(sheet)
+    return True
+
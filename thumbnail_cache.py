@@ -0,0 +1,215 @@
+"""
+预缩放图片的磁盘缓存：开屏和首次引导要用的每一种 (逻辑尺寸, 设备像素比) 变体各存一个文件，
+内容是已经按 KeepAspectRatio 缩放好的 ARGB32_Premultiplied 像素，读出来直接包成 QImage，不用解码 PNG、也不用缩放。
+
+缓存键是源文件内容的 SHA-1，图片换了自然就找不到旧变体；目录总大小超过 max_bytes 时按最近使用时间淘汰。
+第一次启动时缺的变体在后台线程里生成（QImage 可以在非 GUI 线程缩放），也可以在安装时提前生成：
+
+    python thumbnail_cache.py                 # 按 assets.PRESCALED 生成常见设备像素比的所有变体
+    python thumbnail_cache.py --dpr 1 --dpr 2
+"""
+import os
+import sys
+import struct
+import hashlib
+import threading
+
+from disk_cache import cache_path, prune_lru
+
+# 文件头: 魔数, 格式版本, 像素宽, 像素高, 每行字节数, 设备像素比；后面紧跟 每行字节数 x 像素高 的像素数据
+MAGIC = b"OOBETHM1"
+CACHE_VERSION = 1
+HEADER = struct.Struct("<8sIIIId")
+CACHE_SUFFIX = ".thumb"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# 安装时生成的设备像素比，覆盖常见的 100% / 125% / 150% / 200% 缩放
+INSTALL_DPRS = (1.0, 1.25, 1.5, 2.0)
+
+
+def default_cache_dir():
+    return cache_path("thumbnails")
+
+
+def render_variant(image, size, dpr):
+    """把原图缩放成 size 逻辑尺寸、dpr 设备像素比下的 QImage（物理像素 = 逻辑尺寸 x dpr）。任意线程可调用。"""
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QImage
+
+    if image.isNull():
+        return image
+    width, height = max(1, round(size[0] * dpr)), max(1, round(size[1] * dpr))
+    scaled = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    scaled = scaled.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    scaled.setDevicePixelRatio(dpr)
+    return scaled
+
+
+class ThumbnailCache:
+    """
+    按源文件内容哈希 + 逻辑尺寸 + 设备像素比存取预缩放的变体。load() / store() / prefill() 都可以在任意线程调用；
+    同一个源文件的哈希只算一次。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self._digests = {}
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def digest(self, source_path):
+        st = os.stat(source_path)
+        stamp = (source_path, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(stamp)
+        if digest is None:
+            hasher = hashlib.sha1(f"{CACHE_VERSION}:".encode())
+            with open(source_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    hasher.update(chunk)
+            digest = hasher.hexdigest()
+            with self._lock:
+                self._digests[stamp] = digest
+        return digest
+
+    def path_for(self, source_path, size, dpr):
+        name = "{}_{}x{}@{:.2f}{}".format(self.digest(source_path), size[0], size[1], dpr, CACHE_SUFFIX)
+        return os.path.join(self.cache_dir, name)
+
+    def load(self, source_path, size, dpr):
+        """读出缓存好的变体（设置好设备像素比的 QImage），缺失或损坏时返回 None（损坏的文件顺便删掉）。"""
+        from PySide6.QtGui import QImage
+
+        try:
+            path = self.path_for(source_path, size, dpr)
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            if len(data) < HEADER.size:
+                raise ValueError("文件太短")
+            magic, version, width, height, bytes_per_line, stored_dpr = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != CACHE_VERSION:
+                raise ValueError("文件头不匹配")
+            if width == 0 or height == 0 or bytes_per_line < width * 4 \
+                    or len(data) != HEADER.size + bytes_per_line * height:
+                raise ValueError("文件长度不匹配")
+        except ValueError as e:
+            print(f"预缩放图片缓存损坏，重新生成: {e}")
+            self._remove(path)
+            return None
+        pixels = memoryview(data)[HEADER.size:]
+        # copy() 让 QImage 持有自己的像素，不再引用读出来的 bytes
+        image = QImage(pixels, width, height, bytes_per_line, QImage.Format_ARGB32_Premultiplied).copy()
+        image.setDevicePixelRatio(stored_dpr)
+        try:
+            # 记录最近使用时间，淘汰时用
+            os.utime(path)
+        except OSError:
+            pass
+        return image
+
+    def store(self, source_path, size, dpr, image):
+        """写入一个变体：先写临时文件再 os.replace。image 应该是 render_variant() 的结果。"""
+        from PySide6.QtGui import QImage
+
+        if image.isNull():
+            return False
+        if image.format() != QImage.Format_ARGB32_Premultiplied:
+            image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.path_for(source_path, size, dpr)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, CACHE_VERSION, image.width(), image.height(),
+                                    image.bytesPerLine(), dpr))
+                f.write(memoryview(image.constBits()).cast("B")[:image.bytesPerLine() * image.height()])
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"保存预缩放图片失败: {e}")
+            self._remove(tmp_path)
+            return False
+        self.prune(keep=path)
+        return True
+
+    def ensure(self, source_path, variants, image=None):
+        """生成 variants（[(逻辑尺寸, 设备像素比), ...]）里还没有缓存的变体，返回新生成的个数。image 是已经解码好的原图。"""
+        from PySide6.QtGui import QImage
+
+        created = 0
+        for size, dpr in variants:
+            try:
+                if os.path.exists(self.path_for(source_path, size, dpr)):
+                    continue
+            except OSError:
+                return created
+            if image is None:
+                image = QImage(source_path)
+                if image.isNull():
+                    return created
+            if self.store(source_path, size, dpr, render_variant(image, size, dpr)):
+                created += 1
+        return created
+
+    def prefill(self, source_path, variants, image=None):
+        """在后台线程里 ensure()，同一个源文件同时只跑一个。返回线程对象（已经在跑时返回 None）。"""
+        with self._lock:
+            if source_path in self._pending:
+                return None
+            self._pending.add(source_path)
+
+        def run():
+            try:
+                self.ensure(source_path, variants, image)
+            except Exception as e:
+                print(f"生成预缩放图片失败: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(source_path)
+
+        thread = threading.Thread(target=run, name="thumbnail-prefill", daemon=True)
+        thread.start()
+        return thread
+
+    def prune(self, keep=None):
+        prune_lru(self.cache_dir, CACHE_SUFFIX, self.max_bytes, keep)
+
+    @staticmethod
+    def _remove(path):
+        if not path:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def main():
+    import argparse
+    from assets import PRESCALED, default_resolver
+
+    parser = argparse.ArgumentParser(description="提前生成开屏和首次引导用的预缩放图片")
+    parser.add_argument("--dpr", type=float, action="append", help="设备像素比，可以给多次（默认 1 / 1.25 / 1.5 / 2）")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv[:1])  # noqa: F841
+
+    resolver = default_resolver()
+    cache = ThumbnailCache()
+    dprs = args.dpr or INSTALL_DPRS
+    for name, sizes in PRESCALED.items():
+        path = resolver.path(name)
+        if not path:
+            print(f"{name} 不存在，跳过")
+            continue
+        created = cache.ensure(path, [(size, dpr) for size in sizes for dpr in dprs])
+        print(f"{name}: 新生成 {created} 个变体 -> {cache.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
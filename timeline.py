@@ -0,0 +1,221 @@
+"""
+声明式时间轴：一个时钟驱动所有轨道，代替一串 QTimer.singleShot 加各自独立计时的 QPropertyAnimation / QTimer。
+
+    timeline = Timeline("splash")
+    timeline.tween("window.opacity", window.setWindowOpacity, 0, 800, 0.0, 1.0)
+    timeline.steps("title.visible", title.setVisible, [(0, False), (500, True)])
+    timeline.cue("music.play", 0, play_music)
+
+轨道的值只由时间决定：seek(t) 直接把所有轨道摆到 t 时刻的状态，可以前后拖动，不触发 cue；
+advance(dt) 按 speed 倍速前进，把经过的 cue 按时间顺序触发一次。
+同一个 key 上有多条轨道时，以已经开始的轨道里开始得最晚的那条为准；一条都没开始时停在第一条的起始值。
+起止值可以是无参函数，第一次用到时才求值（比如依赖窗口尺寸的位置），reset_values() 以后重新求值。
+
+Timeline 本身不依赖 Qt，测试里可以不开事件循环用 step_through() 按固定步长一口气播完；
+TimelinePlayer 用一个 QTimer 按真实流逝的时间在界面上播放。时间单位都是毫秒。
+"""
+import time
+
+import frametrace
+
+
+def _resolve(value):
+    return value() if callable(value) else value
+
+
+class Tween:
+    """从 start 开始、持续 duration 的补间。数值、QPoint / QPointF 这类支持加减和数乘的值都可以插值。"""
+
+    def __init__(self, key, setter, start, duration, from_value, to_value, easing=None):
+        self.key = key
+        self.setter = setter
+        self.start = start
+        self.duration = duration
+        self.easing = easing
+        self._from = from_value
+        self._to = to_value
+        self._resolved = None
+
+    @property
+    def end(self):
+        return self.start + self.duration
+
+    def reset(self):
+        self._resolved = None
+
+    def value_at(self, t):
+        if self._resolved is None:
+            self._resolved = (_resolve(self._from), _resolve(self._to))
+        from_value, to_value = self._resolved
+        if self.duration <= 0:
+            progress = 1.0
+        else:
+            progress = min(1.0, max(0.0, (t - self.start) / self.duration))
+        if self.easing is not None:
+            progress = self.easing(progress)
+        return from_value + (to_value - from_value) * progress
+
+
+class Steps:
+    """阶跃轨道：keyframes 是按时间排好的 [(时间, 值), ...]，每个值一直保持到下一个关键帧。"""
+
+    def __init__(self, key, setter, keyframes):
+        self.key = key
+        self.setter = setter
+        self.keyframes = sorted(keyframes, key=lambda frame: frame[0])
+        self.start = self.keyframes[0][0]
+        self.end = self.keyframes[-1][0]
+
+    def reset(self):
+        pass
+
+    def value_at(self, t):
+        value = self.keyframes[0][1]
+        for at, frame_value in self.keyframes:
+            if at > t:
+                break
+            value = frame_value
+        return _resolve(value)
+
+
+class Timeline:
+    """
+    一组轨道和 cue，共用一个播放头 time。
+    name 用于 frametrace：开启 trace 时每个轨道的值变化都记一条 "<name>.tick"。
+    """
+
+    def __init__(self, name="timeline"):
+        self.name = name
+        self.time = 0.0
+        self.speed = 1.0
+        self._tracks = {}
+        self._cues = []
+        self._next_cue = 0
+        self._applied = {}
+
+    def tween(self, key, setter, start, duration, from_value, to_value, easing=None):
+        return self._add(Tween(key, setter, start, duration, from_value, to_value, easing))
+
+    def steps(self, key, setter, keyframes):
+        return self._add(Steps(key, setter, keyframes))
+
+    def cue(self, name, at, callback):
+        """在播放头经过 at 时调用一次 callback（seek 不会触发）。"""
+        self._cues.append((at, len(self._cues), name, callback))
+        self._cues.sort(key=lambda cue: cue[:2])
+
+    def _add(self, track):
+        tracks = self._tracks.setdefault(track.key, [])
+        tracks.append(track)
+        tracks.sort(key=lambda item: item.start)
+        return track
+
+    @property
+    def duration(self):
+        ends = [track.end for tracks in self._tracks.values() for track in tracks]
+        ends.extend(cue[0] for cue in self._cues)
+        return max(ends, default=0)
+
+    @property
+    def finished(self):
+        return self._next_cue >= len(self._cues) and self.time >= self.duration
+
+    def value_at(self, key, t):
+        tracks = self._tracks[key]
+        active = tracks[0]
+        for track in tracks:
+            if track.start > t:
+                break
+            active = track
+        return active.value_at(t)
+
+    def reset_values(self):
+        """丢掉已经求过值的起止值（比如窗口尺寸变了），下次应用时重新求值。"""
+        for tracks in self._tracks.values():
+            for track in tracks:
+                track.reset()
+        self._applied.clear()
+
+    def seek(self, t):
+        """把播放头移到 t，所有轨道直接摆到 t 时刻的状态。t 之前的 cue 算作已经过去，正好在 t 的 cue 下次 advance 时触发。"""
+        self.time = min(max(0.0, t), self.duration)
+        self._next_cue = 0
+        while self._next_cue < len(self._cues) and self._cues[self._next_cue][0] < self.time:
+            self._next_cue += 1
+        self._apply()
+
+    def advance(self, dt):
+        """播放头前进 dt * speed 毫秒，应用轨道，再按时间顺序触发经过的 cue。"""
+        if self.finished:
+            return
+        self.time = min(self.duration, self.time + dt * self.speed)
+        self._apply()
+        while self._next_cue < len(self._cues) and self._cues[self._next_cue][0] <= self.time:
+            callback = self._cues[self._next_cue][3]
+            self._next_cue += 1
+            callback()
+
+    def step_through(self, step=1000 / 60, on_step=None):
+        """不开事件循环，每步 advance(step) 一直播到结尾（比如逐帧截图时传 on_step），返回走了多少步。"""
+        steps = 0
+        while not self.finished:
+            self.advance(step)
+            steps += 1
+            if on_step:
+                on_step(self.time)
+        return steps
+
+    def _apply(self):
+        for key in self._tracks:
+            value = self.value_at(key, self.time)
+            if key in self._applied and self._applied[key] == value:
+                continue
+            self._applied[key] = value
+            self._tracks[key][0].setter(value)
+            frametrace.instant(f"{self.name}.tick", cat="animation", anim=key)
+
+
+class TimelinePlayer:
+    """
+    在 Qt 事件循环里实时播放 Timeline：只有一个 QTimer，每次 tick 按真实流逝的时间前进，
+    某一次 tick 来晚了也只是这一步跨得大一点，所有轨道仍然对齐同一个时间，不会各自漂移。
+    播完后调用 on_finished。
+    """
+
+    def __init__(self, timeline, interval=16, on_finished=None):
+        from PySide6.QtCore import Qt, QTimer
+
+        self.timeline = timeline
+        self.on_finished = on_finished
+        self._last = None
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._tick)
+
+    @property
+    def is_playing(self):
+        return self._timer.isActive()
+
+    def start(self):
+        self._last = time.perf_counter()
+        self.timeline.advance(0)
+        if not self._finish_if_done():
+            self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        elapsed, self._last = (now - self._last) * 1000, now
+        self.timeline.advance(elapsed)
+        self._finish_if_done()
+
+    def _finish_if_done(self):
+        if not self.timeline.finished:
+            return False
+        self._timer.stop()
+        if self.on_finished:
+            self.on_finished()
+        return True
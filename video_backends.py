@@ -0,0 +1,313 @@
+"""
+开场视频的解码后端。VideoPlayer 只通过这里的接口拿帧，不直接依赖某一个解码库：
+
+    pyav          PyAV（FFmpeg）。缩放和转 RGB 由 swscale 一步做完
+    opencv        cv2.VideoCapture。grab / retrieve 分开，解码落后时可以只 grab 不转换；出来的是 BGR，要再换一次通道
+    qtmultimedia  QMediaPlayer + QVideoSink。Qt 自己按时间推帧，不需要 cv2 / numpy
+
+probe() 只用 find_spec 查模块在不在，不真正导入；导入放在 load() / open() 里，由解码线程调用。
+select_backends() 按 BACKEND_ORDER（或者指定的后端优先）返回探测通过的后端类，打开失败时依次换下一个。
+这个模块本身不依赖 Qt，解码子进程（decode_process）也用它。
+"""
+import os
+from importlib import import_module
+from importlib.util import find_spec
+
+# 按 benchmarks/decoders.py 的结果排：PyAV 首帧和吞吐都比 OpenCV 好（swscale 一步缩放 + 多线程解码），
+# QtMultimedia 不能逐帧控制、依赖系统多媒体库，放最后
+BACKEND_ORDER = ("pyav", "opencv", "qtmultimedia")
+# 以前的 OOBE_DECODE_BACKEND=thread 就是线程内的 OpenCV 解码
+BACKEND_ALIASES = {"thread": "opencv"}
+
+
+def fit_size(src_w, src_h, target):
+    """按 KeepAspectRatio 算出目标区域 (逻辑宽, 逻辑高, 设备像素比) 的物理像素尺寸，返回 (宽, 高, 设备像素比)。"""
+    if target is None:
+        return src_w, src_h, 1.0
+    width, height, dpr = target
+    scale = min(width * dpr / src_w, height * dpr / src_h)
+    return max(1, int(round(src_w * scale))), max(1, int(round(src_h * scale))), dpr
+
+
+def _module_available(name):
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class DecodeBackend:
+    """
+    解码后端的接口。pull = True 的后端由 VideoPlayer 的解码线程拉帧：
+    open() 之后反复 grab() 前进一帧、pts() 取时间戳，需要显示时再 retrieve() 转成 RGB 写进给定的缓冲。
+    pull = False 的后端自己按播放时间推帧，接口见 QtMultimediaBackend。
+    """
+    name = None
+    modules = ()
+    pull = True
+
+    @classmethod
+    def probe(cls):
+        """只查依赖的模块能不能找到，不导入。"""
+        return all(_module_available(name) for name in cls.modules)
+
+    @classmethod
+    def load(cls):
+        """导入依赖的模块，可以在任意线程提前调用。导入失败抛 ImportError。"""
+        for name in cls.modules:
+            import_module(name)
+
+    def __init__(self, path):
+        self.path = path
+        self.fps = 30.0
+        self.width = 0
+        self.height = 0
+        # 容器里记录的总帧数，拿不到时为 0
+        self.frame_count = 0
+        # retrieve() 没法直接写进给定缓冲、为转换临时分配帧的次数
+        self.scratch_allocations = 0
+
+    def open(self):
+        """打开视频并读出 fps / 宽 / 高（和能拿到的总帧数），打不开时返回 False。"""
+        raise NotImplementedError
+
+    def grab(self):
+        """前进到下一帧，没有更多帧时返回 False。"""
+        raise NotImplementedError
+
+    def pts(self, index):
+        """刚 grab 到的帧的时间戳（秒）；index 是帧序号，后端拿不到时间戳时用它推算。"""
+        return index / self.fps
+
+    def retrieve(self, out, interpolation=None, fast=False):
+        """
+        把刚 grab 到的帧转成 RGB，按 out 的尺寸缩放写进 out（height x width x 3 的 uint8 数组）。
+        fast=True 时缩放改用便宜的双线性，给渲染降级用。
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class OpenCVBackend(DecodeBackend):
+    name = "opencv"
+    modules = ("numpy", "cv2")
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._cv2 = None
+        self._cap = None
+        self._buffer = None
+
+    def open(self):
+        import cv2
+        self._cv2 = cv2
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            return False
+        self.width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self.fps = float(fps) if fps and fps > 0 else 30.0
+        self.frame_count = max(0, int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0))
+        return True
+
+    def grab(self):
+        return self._cap.grab()
+
+    def pts(self, index):
+        # 部分后端拿不到时间戳（始终返回 0），这时退回到帧序号推算
+        try:
+            msec = self._cap.get(self._cv2.CAP_PROP_POS_MSEC)
+        except Exception:
+            msec = 0
+        if msec and msec > 0:
+            return msec / 1000.0
+        return index / self.fps
+
+    def retrieve(self, out, interpolation=None, fast=False):
+        cv2 = self._cv2
+        height, width = out.shape[:2]
+        if (width, height) == (self.width, self.height):
+            ret, frame = self._cap.retrieve(out)
+            if not ret:
+                return False
+            # 没有直接写进给它的缓冲时顺便拷过去
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+            return True
+        ret, self._buffer = self._cap.retrieve(self._buffer)
+        if not ret:
+            return False
+        if interpolation is None:
+            interpolation = cv2.INTER_AREA if width < self.width and not fast else cv2.INTER_LINEAR
+        cv2.resize(self._buffer, (width, height), dst=out, interpolation=interpolation)
+        # 缩小以后再换通道，少处理一些像素
+        cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=out)
+        return True
+
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+
+
+class PyAVBackend(DecodeBackend):
+    name = "pyav"
+    modules = ("numpy", "av")
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._container = None
+        self._frames = None
+        self._frame = None
+        self._time_base = None
+        self._reformatter = None
+
+    def open(self):
+        import av
+        from av.video.reformatter import VideoReformatter
+        try:
+            self._container = av.open(self.path)
+        except Exception as e:
+            print(f"PyAV 无法打开视频: {e}")
+            return False
+        if not self._container.streams.video:
+            return False
+        stream = self._container.streams.video[0]
+        stream.thread_type = "AUTO"
+        rate = stream.average_rate or stream.guessed_rate
+        self.fps = float(rate) if rate else 30.0
+        self.width = stream.codec_context.width
+        self.height = stream.codec_context.height
+        self.frame_count = stream.frames or 0
+        self._time_base = stream.time_base
+        self._frames = self._container.decode(stream)
+        # frame.reformat() 每次都新建一个 SwsContext，整段播放共用一个
+        self._reformatter = VideoReformatter()
+        return True
+
+    def grab(self):
+        self._frame = next(self._frames, None)
+        return self._frame is not None
+
+    def pts(self, index):
+        frame = self._frame
+        if frame.pts is not None and self._time_base:
+            return float(frame.pts * self._time_base)
+        return index / self.fps
+
+    def retrieve(self, out, interpolation=None, fast=False):
+        import numpy as np
+        height, width = out.shape[:2]
+        # interpolation 是 cv2 的常量，这里只按放大 / 缩小选 swscale 的算法
+        if fast:
+            method = "FAST_BILINEAR"
+        else:
+            method = "AREA" if width < self.width else "BILINEAR"
+        # PyAV 没有让 swscale 写进现成缓冲的接口，输出帧总是新分配的（尺寸、格式都不用变时除外），
+        # 再拷一次进 out；rgb24 的 to_ndarray() 只是这个帧的视图，不会再多拷一次。分配次数见 scratch_allocations
+        frame = self._reformatter.reformat(self._frame, width=width, height=height, format="rgb24",
+                                           interpolation=method)
+        if frame is not self._frame:
+            self.scratch_allocations += 1
+        np.copyto(out, frame.to_ndarray())
+        return True
+
+    def close(self):
+        self._frames = None
+        self._frame = None
+        self._reformatter = None
+        if self._container is not None:
+            self._container.close()
+
+
+class QtMultimediaBackend(DecodeBackend):
+    """
+    QMediaPlayer + QVideoSink：Qt 自己解码、按播放时间送帧，不能逐帧拉。
+    start() 在主线程调用；on_frame(QImage, pts) 在 Qt 送帧的线程里直接调用，
+    on_finished(错误说明或 None) 在主线程调用。
+    """
+    name = "qtmultimedia"
+    modules = ("PySide6.QtMultimedia",)
+    pull = False
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._player = None
+        self._sink = None
+        self._on_frame = None
+        self._on_finished = None
+        # 基准测试用更快的速度播放来估解码吞吐
+        self.playback_rate = 1.0
+
+    def start(self, on_frame, on_finished):
+        """开始播放；QtMultimedia 加载不了（比如缺系统音频库）时抛 ImportError。"""
+        from PySide6.QtCore import Qt, QUrl
+        from PySide6.QtMultimedia import QMediaPlayer, QVideoSink
+
+        self._on_frame = on_frame
+        self._on_finished = on_finished
+        self._player = QMediaPlayer()
+        self._sink = QVideoSink()
+        self._player.setVideoSink(self._sink)
+        # 直接在 Qt 送帧的线程里转成 QImage，不占主线程
+        self._sink.videoFrameChanged.connect(self._handle_frame, Qt.DirectConnection)
+        self._player.mediaStatusChanged.connect(self._handle_status)
+        self._player.errorOccurred.connect(self._handle_error)
+        self._player.setSource(QUrl.fromLocalFile(os.path.abspath(self.path)))
+        if self.playback_rate != 1.0:
+            self._player.setPlaybackRate(self.playback_rate)
+        self._player.play()
+
+    def _handle_frame(self, frame):
+        if self._on_frame is None or not frame.isValid():
+            return
+        image = frame.toImage()
+        if image.isNull():
+            return
+        self.width, self.height = image.width(), image.height()
+        start = frame.startTime()
+        self._on_frame(image, start / 1e6 if start >= 0 else None)
+
+    def _handle_status(self, status):
+        from PySide6.QtMultimedia import QMediaPlayer
+        if status == QMediaPlayer.EndOfMedia:
+            self._finish(None)
+        elif status == QMediaPlayer.InvalidMedia:
+            self._finish("无法解码视频")
+
+    def _handle_error(self, error, message):
+        self._finish(message or str(error))
+
+    def _finish(self, error):
+        callback, self._on_finished = self._on_finished, None
+        if callback:
+            callback(error)
+
+    def close(self):
+        self._on_frame = None
+        self._on_finished = None
+        if self._player is not None:
+            self._player.stop()
+            self._player.setVideoSink(None)
+            self._player = None
+            self._sink = None
+
+
+BACKENDS = {cls.name: cls for cls in (OpenCVBackend, PyAVBackend, QtMultimediaBackend)}
+
+
+def available_backends():
+    """按 BACKEND_ORDER 返回探测通过的后端类。"""
+    return [BACKENDS[name] for name in BACKEND_ORDER if BACKENDS[name].probe()]
+
+
+def select_backends(preferred="auto"):
+    """
+    返回依次尝试的后端类：指定的后端（探测通过时）排第一，其余可用的按 BACKEND_ORDER 作为后备。
+    preferred 是 "auto" 或者不认识的名字时只按 BACKEND_ORDER。
+    """
+    preferred = BACKEND_ALIASES.get(preferred, preferred)
+    backends = available_backends()
+    backends.sort(key=lambda cls: cls.name != preferred)
+    return backends